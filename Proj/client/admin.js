@@ -45,28 +45,63 @@ async function loadLocations(){
 window.loadLocations = loadLocations;
 
 let __listLoaded = false;
-async function loadAll(){
+let __nextCursor = null;
+const PAGE_SIZE = 100;
+
+function renderRow(r){
+  return `<li>
+    <div>#${r.id} | ${r.start_time} ~ ${r.end_time} | ${r.campus} - ${r.location} | ${r.visitor_name} (${r.visitor_org||'-'}) | Status:${r.status}</div>
+    ${r.status==='pending'
+      ? `<button data-approve="${r.id}">Approve</button> <button data-deny="${r.id}" class="secondary">Deny</button>` : ''}
+  </li>`;
+}
+
+async function loadAll(more = false){
   const date = document.querySelector('#date')?.value || '';
   const locid = document.querySelector('#locid')?.value || '';
   const qs = new URLSearchParams();
   if(date) qs.set('date', date);
   if(locid) qs.set('location_id', locid);
+  qs.set('limit', PAGE_SIZE);
+  if(more && __nextCursor) qs.set('cursor', __nextCursor);
 
   const data = await api('/reservations/admin/reservations?'+qs.toString());
   const ul = document.querySelector('#all-list');
   const rows = (data && Array.isArray(data.results)) ? data.results : [];
-  if (rows.length === 0) {
+  __nextCursor = data?.next_cursor || null;
+  const moreBtn = document.querySelector('#more-btn');
+  if (moreBtn) moreBtn.style.display = __nextCursor ? '' : 'none';
+  if (!more && rows.length === 0) {
     ul.innerHTML = '<li class="muted">No Data</li>';
     return;
   }
-  ul.innerHTML = rows.map(r=>`<li>
-    <div>#${r.id} | ${r.start_time} ~ ${r.end_time} | ${r.campus} - ${r.location} | ${r.visitor_name} (${r.visitor_org||'-'}) | Status:${r.status}</div>
-    ${r.status==='pending'
-      ? `<button data-approve="${r.id}">Approve</button> <button data-deny="${r.id}" class="secondary">Deny</button>` : ''}
-  </li>`).join('');
+  const html = rows.map(renderRow).join('');
+  if (more) ul.insertAdjacentHTML('beforeend', html);
+  else ul.innerHTML = html;
 }
 window.loadAll = loadAll;
 
+// Streams the server-side export (same filters as the list) into a file download.
+async function exportCsv(){
+  const date = document.querySelector('#date')?.value || '';
+  const locid = document.querySelector('#locid')?.value || '';
+  const qs = new URLSearchParams({ format: 'csv' });
+  if(date) qs.set('date', date);
+  if(locid) qs.set('location_id', locid);
+  try{
+    const res = await fetch(`${BASE_URL}/reservations/admin/reservations/export?${qs}`, {
+      headers: { 'Authorization': `Bearer ${storage.token}` }
+    });
+    if(!res.ok) throw new Error(await res.text().catch(() => res.statusText));
+    const url = URL.createObjectURL(await res.blob());
+    const a = document.createElement('a');
+    a.href = url; a.download = 'reservations.csv';
+    a.click();
+    URL.revokeObjectURL(url);
+  }catch(err){ alert('Export failed: '+(err?.message||err)); }
+}
+window.exportCsv = exportCsv;
+
 addEventListener('click', async (e)=>{
   if(e.target.dataset.approve || e.target.dataset.deny){
     const id = e.target.dataset.approve || e.target.dataset.deny;
@@ -74,12 +109,37 @@ addEventListener('click', async (e)=>{
     try{
       await api(`/reservations/${id}/decision?decision=${decision}`,{method:'PUT'});
       loadAll();
+      loadSummary();
     }catch(err){ alert('Approval failed: '+(err?.message||err)); }
   }
 });
 
 function numberFormat(n){ const v = Number(n); return Number.isFinite(v) ? String(Math.round(v)) : '-'; }
 
+// Dashboard counters; served from in-memory counters, so cheap to reload after every decision.
+async function loadSummary(){
+  const set = (id, val) => { const el = document.getElementById(id); if (el) el.textContent = val; };
+  try{
+    const s = await api('/reservations/admin/summary');
+    const campuses = Object.entries(s?.by_campus || {});
+    const body = document.querySelector('#sum-campus');
+    if (body) body.innerHTML = campuses.length
+      ? campuses.map(([campus, c]) => `<tr><th>${campus}</th><td>${numberFormat(c.pending)}</td><td>${numberFormat(c.approved)}</td><td>${numberFormat(c.denied)}</td></tr>`).join('')
+      : '<tr><td colspan="4" class="muted">No Data</td></tr>';
+    set('sum-today', numberFormat(s?.today?.total));
+    set('sum-today-pending', numberFormat(s?.today?.pending));
+    set('sum-today-approved', numberFormat(s?.today?.approved));
+    const arrivals = Array.isArray(s?.upcoming_arrivals) ? s.upcoming_arrivals : [];
+    const ul = document.querySelector('#sum-arrivals');
+    if (ul) ul.innerHTML = arrivals.length
+      ? arrivals.map(a => `<li>${a.hour} - ${numberFormat(a.approved)} visitor(s)</li>`).join('')
+      : '<li class="muted">No more arrivals today</li>';
+  }catch(err){
+    console.warn('[admin] Failed to load summary:', err);
+  }
+}
+window.loadSummary = loadSummary;
+
 async function loadReport(){
   const d = document.querySelector('#rdate')?.value;
   const qs = d ? `?date=${d}` : '';
@@ -208,6 +268,7 @@ window.ensureListData = ensureListData;
 
 document.addEventListener('DOMContentLoaded', async () => {
   try { await waitForApi(); } catch(e){ console.warn('waitForApi timeout, continue initialization'); }
+  loadSummary();
   try { await ensureListData(); } catch(e){ console.warn('init ensureListData error:', e); }
 });
 
@@ -366,6 +366,19 @@ document.querySelector('#next-page').addEventListener('click', () => {
 });
 document.querySelector('#reload-noti').addEventListener('click', () => loadNotifications(true));
 
+// Server push: the badge/list only refresh when an admin actually decides something.
+// EventSource reconnects by itself and resumes with Last-Event-ID.
+let _notiStream = null;
+function openNotificationStream() {
+  if (_notiStream || !window.EventSource || !storage.token) return;
+  _notiStream = new EventSource(`${BASE_URL}/notifications/notifications/stream?token=${encodeURIComponent(storage.token)}`);
+  _notiStream.addEventListener('notification', () => {
+    loadUnreadCount();
+    if (document.querySelector('#tab-noti')?.classList.contains('active')) loadNotifications();
+    if (document.querySelector('#tab-list')?.classList.contains('active')) loadReservations();
+  });
+}
+
 document.querySelector('#edit-campus').addEventListener('change', (e) => {
   const campus = e.target.value;
   renderEditLocations(campus, null); 
@@ -375,5 +388,7 @@ document.querySelector('#edit-campus').addEventListener('change', (e) => {
   await loadLocations();
   await loadProfile();
   switchTab('new');
+  loadUnreadCount();
+  openNotificationStream();
 })();
 
@@ -15,7 +15,7 @@ from app.database import SQLALCHEMY_DATABASE_URL, Base
 from app import models                                    
 
 config = context.config
-config.set_main_option("sqlalchemy.url", SQLALCHEMY_DATABASE_URL) 
+config.set_main_option("sqlalchemy.url", SQLALCHEMY_DATABASE_URL.replace("%", "%%"))  # configparser interpolation
 
 if config.config_file_name:
     fileConfig(config.config_file_name)
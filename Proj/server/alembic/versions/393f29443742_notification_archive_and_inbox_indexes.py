@@ -0,0 +1,56 @@
+"""notification archive and inbox indexes
+
+Revision ID: 393f29443742
+Revises: f093aad170e0
+Create Date: 2026-10-18 07:34:42.742681
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '393f29443742'
+down_revision: Union[str, Sequence[str], None] = 'f093aad170e0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('notification_archive',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('visitor_id', sa.Integer(), nullable=False),
+    sa.Column('type', sa.String(length=50), nullable=False),
+    sa.Column('reservation_id', sa.Integer(), nullable=True),
+    sa.Column('title', sa.String(length=200), nullable=False),
+    sa.Column('body', sa.String(), nullable=True),
+    sa.Column('is_read', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['visitor_id'], ['visitor.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('notification_archive', schema=None) as batch_op:
+        batch_op.create_index('ix_notif_archive_visitor_created', ['visitor_id', 'created_at'], unique=False)
+
+    # visitor_id alone is a prefix of both new indexes
+    with op.batch_alter_table('notification', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_notification_visitor_id'))
+        batch_op.create_index('ix_notif_visitor_created', ['visitor_id', 'created_at'], unique=False)
+        batch_op.create_index('ix_notif_visitor_read_created', ['visitor_id', 'is_read', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('notification', schema=None) as batch_op:
+        batch_op.drop_index('ix_notif_visitor_read_created')
+        batch_op.drop_index('ix_notif_visitor_created')
+        batch_op.create_index(batch_op.f('ix_notification_visitor_id'), ['visitor_id'], unique=False)
+
+    with op.batch_alter_table('notification_archive', schema=None) as batch_op:
+        batch_op.drop_index('ix_notif_archive_visitor_created')
+
+    op.drop_table('notification_archive')
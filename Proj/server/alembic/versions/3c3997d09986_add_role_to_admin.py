@@ -29,10 +29,17 @@ def upgrade():
             "admin",
             sa.Column("role", sa.String(length=20), nullable=False, server_default="admin"),
         )
-        # 建完列后去掉 server_default（可选）
-        op.alter_column("admin", "role", server_default=None)
+        # 建完列后去掉 server_default（可选）; SQLite 需要 batch 模式才能改列
+        with op.batch_alter_table("admin", schema=None) as batch_op:
+            batch_op.alter_column("role", server_default=None)
 
     # 2) 索引是否已存在？（可选）
     idx_names = [ix["name"] for ix in insp.get_indexes("admin")]
     if "ix_admin_role" not in idx_names:
-        op.create_index("ix_admin_role", "admin", ["role"])
\ No newline at end of file
+        op.create_index("ix_admin_role", "admin", ["role"])
+
+
+def downgrade():
+    with op.batch_alter_table("admin", schema=None) as batch_op:
+        batch_op.drop_index("ix_admin_role")
+        batch_op.drop_column("role")
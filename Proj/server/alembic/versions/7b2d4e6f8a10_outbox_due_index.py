@@ -0,0 +1,32 @@
+"""notification_outbox (dispatched_at, available_at, id) index
+
+Revision ID: 7b2d4e6f8a10
+Revises: e3a7c9d2b541
+Create Date: 2026-10-18 18:40:11.402913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b2d4e6f8a10'
+down_revision: Union[str, Sequence[str], None] = 'e3a7c9d2b541'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('notification_outbox', schema=None) as batch_op:
+        batch_op.drop_index('ix_outbox_undispatched')
+        batch_op.create_index('ix_outbox_due', ['dispatched_at', 'available_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('notification_outbox', schema=None) as batch_op:
+        batch_op.drop_index('ix_outbox_due')
+        batch_op.create_index('ix_outbox_undispatched', ['dispatched_at', 'id'], unique=False)
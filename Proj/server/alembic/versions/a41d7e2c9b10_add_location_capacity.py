@@ -0,0 +1,36 @@
+"""add location capacity and location_id time index
+
+Revision ID: a41d7e2c9b10
+Revises: 3c3997d09986
+Create Date: 2026-10-18 09:12:41.207315
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a41d7e2c9b10'
+down_revision: Union[str, Sequence[str], None] = '3c3997d09986'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('location', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('capacity', sa.Integer(), nullable=True))
+
+    with op.batch_alter_table('reservation', schema=None) as batch_op:
+        batch_op.create_index('ix_resv_locid_time', ['location_id', 'start_time', 'end_time'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('reservation', schema=None) as batch_op:
+        batch_op.drop_index('ix_resv_locid_time')
+
+    with op.batch_alter_table('location', schema=None) as batch_op:
+        batch_op.drop_column('capacity')
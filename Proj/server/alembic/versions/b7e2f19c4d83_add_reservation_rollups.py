@@ -0,0 +1,62 @@
+"""add reservation rollups
+
+Revision ID: b7e2f19c4d83
+Revises: a41d7e2c9b10
+Create Date: 2026-10-18 10:03:27.518842
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2f19c4d83'
+down_revision: Union[str, Sequence[str], None] = 'a41d7e2c9b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('reservation_rollup',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('location_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'location_id', 'status')
+    )
+    op.create_table('visitor_day',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('visitor_id', sa.Integer(), nullable=False),
+    sa.Column('approved_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'visitor_id')
+    )
+    op.create_table('visitor_day_total',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('visitors', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day')
+    )
+
+    op.execute(
+        "INSERT INTO reservation_rollup (day, location_id, status, count) "
+        "SELECT DATE(start_time), COALESCE(location_id, 0), COALESCE(status, 'pending'), COUNT(*) "
+        "FROM reservation GROUP BY 1, 2, 3"
+    )
+    op.execute(
+        "INSERT INTO visitor_day (day, visitor_id, approved_count) "
+        "SELECT DATE(start_time), visitor_id, COUNT(*) "
+        "FROM reservation WHERE status = 'approved' GROUP BY 1, 2"
+    )
+    op.execute(
+        "INSERT INTO visitor_day_total (day, visitors) "
+        "SELECT day, COUNT(*) FROM visitor_day GROUP BY day"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('visitor_day_total')
+    op.drop_table('visitor_day')
+    op.drop_table('reservation_rollup')
@@ -0,0 +1,38 @@
+"""add notification unread counter
+
+Revision ID: c5d1a8e3f2b6
+Revises: b7e2f19c4d83
+Create Date: 2026-10-18 11:42:05.310274
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5d1a8e3f2b6'
+down_revision: Union[str, Sequence[str], None] = 'b7e2f19c4d83'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('notification_unread',
+    sa.Column('visitor_id', sa.Integer(), nullable=False),
+    sa.Column('unread', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['visitor_id'], ['visitor.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('visitor_id')
+    )
+
+    op.execute(
+        "INSERT INTO notification_unread (visitor_id, unread) "
+        "SELECT visitor_id, COUNT(*) FROM notification WHERE is_read = 0 GROUP BY visitor_id"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('notification_unread')
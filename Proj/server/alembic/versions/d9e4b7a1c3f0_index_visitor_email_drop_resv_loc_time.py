@@ -0,0 +1,37 @@
+"""index visitor email, drop ix_resv_loc_time
+
+Revision ID: d9e4b7a1c3f0
+Revises: c5d1a8e3f2b6
+Create Date: 2026-10-18 13:20:41.902117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd9e4b7a1c3f0'
+down_revision: Union[str, Sequence[str], None] = 'c5d1a8e3f2b6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('visitor', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_visitor_email'), ['email'], unique=False)
+
+    # indexed the location *name*; every query filters on location_id (ix_resv_locid_time)
+    with op.batch_alter_table('reservation', schema=None) as batch_op:
+        batch_op.drop_index('ix_resv_loc_time')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('reservation', schema=None) as batch_op:
+        batch_op.create_index('ix_resv_loc_time', ['location', 'start_time', 'end_time'], unique=False)
+
+    with op.batch_alter_table('visitor', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_visitor_email'))
@@ -0,0 +1,30 @@
+"""visitor_day (visitor_id, day) index
+
+Revision ID: e3a7c9d2b541
+Revises: 393f29443742
+Create Date: 2026-10-18 16:12:05.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3a7c9d2b541'
+down_revision: Union[str, Sequence[str], None] = '393f29443742'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('visitor_day', schema=None) as batch_op:
+        batch_op.create_index('ix_visitor_day_visitor_day', ['visitor_id', 'day'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('visitor_day', schema=None) as batch_op:
+        batch_op.drop_index('ix_visitor_day_visitor_day')
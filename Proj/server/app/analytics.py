@@ -0,0 +1,158 @@
+from datetime import date
+import numpy as np
+from sqlalchemy import String, case, func, select, type_coerce
+from sqlalchemy.ext.asyncio import AsyncSession
+from .catalog import location_catalog
+from .models import ReservationRollup, Visitor, VisitorDay, VisitorDayTotal
+from .summary import STATUSES, UNASSIGNED
+
+# Range reports over the (day x location x status) cube that reservation_rollup
+# already is. The cube is read in one grouped range scan of its primary key;
+# every series, group, rate and ranking below is a NumPy reduction over it.
+
+APPROVED, DENIED = STATUSES.index("approved"), STATUSES.index("denied")
+CUBE_PARTITION_ROWS = 256
+
+
+def _day_index(days, first: date) -> np.ndarray:
+    # ISO strings (SQLite) or date objects (PostgreSQL), parsed in one go
+    return (np.array(days, dtype="datetime64[D]") - np.datetime64(first, "D")).astype(np.intp)
+
+
+async def load_cube(db: AsyncSession, first: date, last: date) -> tuple[np.ndarray, np.ndarray]:
+    """(cube[day, location, status], location_ids) for ``first``..``last`` inclusive."""
+    # statuses pivoted into columns, one row per day and location in primary-key
+    # order. Streamed on the Core connection and turned into arrays a small
+    # partition at a time: a year is ~70k rows, and holding them as Python rows
+    # costs more than the scan (ORM result handling; rows that outlive the young
+    # GC generations end in full collections of the whole heap).
+    conn = await db.connection()
+    result = await conn.stream(
+        select(
+            type_coerce(ReservationRollup.day, String),  # skip per-row date parsing
+            ReservationRollup.location_id,
+            *(func.sum(case((ReservationRollup.status == s, ReservationRollup.count), else_=0)) for s in STATUSES),
+        )
+        .where(ReservationRollup.day >= first, ReservationRollup.day <= last)
+        .group_by(ReservationRollup.day, ReservationRollup.location_id)
+        .having(func.sum(ReservationRollup.count) > 0)
+    )
+    days, locations, counts = [], [], []
+    async for rows in result.partitions(CUBE_PARTITION_ROWS):
+        day, location, *by_status = zip(*rows)
+        days.append(_day_index(day, first))
+        locations.append(np.array(location, dtype=np.int64))
+        counts.append(np.array(by_status, dtype=np.int64).T)
+    n_days = (last - first).days + 1
+    if not days:
+        return np.zeros((n_days, 0, len(STATUSES)), dtype=np.int64), np.zeros(0, dtype=np.int64)
+    location_ids, location_idx = np.unique(np.concatenate(locations), return_inverse=True)
+    cube = np.zeros((n_days, len(location_ids), len(STATUSES)), dtype=np.int64)
+    # (day, location_id) is unique per row: plain assignment, no accumulation
+    cube[np.concatenate(days), location_idx] = np.concatenate(counts)
+    return cube, location_ids
+
+
+async def load_visitors(db: AsyncSession, first: date, last: date) -> tuple[np.ndarray, int]:
+    """(visitors with an approved reservation per day, distinct such visitors over the range)."""
+    rows = (await db.execute(
+        select(type_coerce(VisitorDayTotal.day, String), VisitorDayTotal.visitors)
+        .where(VisitorDayTotal.day >= first, VisitorDayTotal.day <= last)
+    )).all()
+    per_day = np.zeros((last - first).days + 1, dtype=np.int64)
+    if rows:
+        days, visitors = zip(*rows)
+        per_day[_day_index(days, first)] = visitors
+    # one (visitor_id, day) index probe per visitor: bounded by the visitor count
+    # however long the range, unlike count(distinct) over every visitor-day in it
+    unique = await db.scalar(
+        select(func.count()).select_from(Visitor).where(
+            select(VisitorDay.visitor_id).where(
+                VisitorDay.visitor_id == Visitor.id, VisitorDay.day >= first, VisitorDay.day <= last,
+            ).exists()
+        )
+    )
+    return per_day, int(unique or 0)
+
+
+def _rates(counts: np.ndarray) -> list[float | None]:
+    # approved / decided (approved + denied); None where nothing was decided
+    decided = counts[..., APPROVED] + counts[..., DENIED]
+    rate = np.divide(counts[..., APPROVED], decided, out=np.zeros(decided.shape), where=decided > 0)
+    return [round(float(r), 4) if d else None for r, d in zip(rate, decided)]
+
+
+def _status_dicts(counts: np.ndarray) -> list[dict]:
+    totals = counts.sum(axis=-1)
+    return [
+        {"total": int(t), **{s: int(n) for s, n in zip(STATUSES, row)}, "approval_rate": r}
+        for t, row, r in zip(totals.tolist(), counts.tolist(), _rates(counts))
+    ]
+
+
+def _group_fields(group_by: str, key) -> dict:
+    if group_by == "campus":
+        return {"campus": key}
+    loc = location_catalog.get(key) if key != UNASSIGNED else None
+    if loc is None:
+        return {"location_id": None, "location_name": UNASSIGNED, "campus": None}
+    return {"location_id": loc.id, "location_name": loc.name, "campus": loc.campus}
+
+
+def range_report(
+    cube: np.ndarray,
+    location_ids: np.ndarray,
+    first: date,
+    last: date,
+    visitors_per_day: np.ndarray,
+    unique_visitors: int,
+    group_by: str,
+    top: int,
+) -> dict:
+    daily = cube.sum(axis=1)                      # [day, status]
+    per_location = cube.sum(axis=0)               # [location, status]
+    known = [location_catalog.get(int(i)) for i in location_ids]
+
+    # location -> group as a one-hot matrix, so group totals and series are matmuls
+    keys = [(loc.campus if group_by == "campus" else loc.id) if loc else UNASSIGNED for loc in known]
+    slots = {k: g for g, k in enumerate(dict.fromkeys(keys))}
+    onehot = np.zeros((len(keys), len(slots)), dtype=np.int64)
+    onehot[np.arange(len(keys)), [slots[k] for k in keys]] = 1
+    group_counts = onehot.T @ per_location        # [group, status]
+    group_daily = cube.sum(axis=2) @ onehot       # [day, group]
+    group_stats = _status_dicts(group_counts)
+    group_keys = list(slots)
+    groups = [
+        {**_group_fields(group_by, group_keys[g]), **group_stats[g], "daily_total": group_daily[:, g].tolist()}
+        for g in np.lexsort((-group_counts[:, APPROVED], -group_counts.sum(axis=1))).tolist()
+    ]
+
+    totals = per_location.sum(axis=1)
+    ranked = [
+        i for i in np.lexsort((-per_location[:, APPROVED], -totals)).tolist()
+        if known[i] is not None and totals[i] > 0
+    ][:top]
+    top_locations = [
+        {"location_id": known[i].id, "location_name": known[i].name, "campus": known[i].campus, **stats}
+        for i, stats in zip(ranked, _status_dicts(per_location[ranked]))
+    ]
+
+    return {
+        "date_from": str(first),
+        "date_to": str(last),
+        "group_by": group_by,
+        "totals": {
+            **_status_dicts(daily.sum(axis=0, keepdims=True))[0],
+            "unique_visitors": unique_visitors,
+            "visitor_days": int(visitors_per_day.sum()),
+        },
+        "daily": {
+            "days": np.arange(np.datetime64(first, "D"), np.datetime64(last, "D") + 1).astype(str).tolist(),
+            "total": daily.sum(axis=1).tolist(),
+            **{s: daily[:, i].tolist() for i, s in enumerate(STATUSES)},
+            "approval_rate": _rates(daily),
+            "unique_visitors": visitors_per_day.tolist(),
+        },
+        "groups": groups,
+        "top_locations": top_locations,
+    }
@@ -1,12 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from jose import jwt
 from datetime import datetime, timedelta
-from .deps import get_db, get_current
-from .models import Visitor, Admin, Reservation
+from .deps import get_async_db, get_async_read_db, get_current, principal_cache
+from .models import Visitor, Admin
 from .schemas import VisitorRegisterIn, VisitorLoginIn, Token, AdminLoginIn,VisitorResetPasswordIn, VisitorUpdateIn, AdminProfileIn, AdminProfileOut,AdminCreateIn
 from .settings import JWT_SECRET, JWT_ALGO, JWT_EXPIRES_MIN
-from passlib.hash import pbkdf2_sha256 as hasher 
+from .database import AsyncSessionLocal
+from .hashing import hash_service
+from .summary import admin_summary
 import re
 
 router = APIRouter()
@@ -16,62 +19,108 @@ def create_token(sub: str, role: str) -> str:
                "exp": datetime.utcnow() + timedelta(minutes=JWT_EXPIRES_MIN)}
     return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGO)
 
+async def upgrade_password_hash(model, pk: int, password: str):
+    try:
+        new_hash = await hash_service.hash(password)
+    except HTTPException:
+        return  # pool saturated; try again on the next login
+    async with AsyncSessionLocal() as db:
+        await db.execute(update(model).where(model.id == pk).values(password_hash=new_hash))
+        await db.commit()
+
+async def visitor_principal(db: AsyncSession, visitor_id: int) -> dict:
+    p = principal_cache.get(("visitor", visitor_id))
+    if p is None:
+        v = await db.get(Visitor, visitor_id)
+        if not v:
+            raise HTTPException(404, "Visitor not found")
+        p = {"id": v.id, "name": v.name, "phone": v.phone, "org": v.org, "email": v.email}
+        principal_cache.put(("visitor", visitor_id), p)
+    return p
+
+async def admin_principal(db: AsyncSession, username: str) -> dict:
+    p = principal_cache.get(("admin", username))
+    if p is None:
+        admin = await db.scalar(select(Admin).where(Admin.username == username).limit(1))
+        if not admin:
+            raise HTTPException(404, "Admin not found")
+        p = {f: getattr(admin, f) for f in AdminProfileOut.model_fields}
+        principal_cache.put(("admin", username), p)
+    return p
+
 @router.post("/visitor/register")
-def visitor_register(data: VisitorRegisterIn, db: Session = Depends(get_db)):
+async def visitor_register(data: VisitorRegisterIn, db: AsyncSession = Depends(get_async_db)):
     email = data.email.strip().lower()
     phone = data.phone.strip()  
 
-    if db.query(Visitor).filter(Visitor.phone == phone).first():
-        raise HTTPException(400, "Phone already exists")
-    if db.query(Visitor).filter(Visitor.email == email).first():
-        raise HTTPException(400, "Email already exists")
+    async def check_unique():
+        if await db.scalar(select(Visitor).where(Visitor.phone == phone).limit(1)):
+            raise HTTPException(400, "Phone already exists")
+        if await db.scalar(select(Visitor).where(Visitor.email == email).limit(1)):
+            raise HTTPException(400, "Email already exists")
+
+    # cheap uniqueness checks first: duplicates never reach the bounded hash pool
+    await check_unique()
+    await db.commit()  # end the read transaction; the connection goes back to the pool while hashing
+    password_hash = await hash_service.hash(data.password)
+    await check_unique()  # again, in the transaction that writes
 
     v = Visitor(
         name=data.name.strip(),
         phone=phone,
         org=(data.org or "").strip() or None,
         email=email,
-        password_hash=hasher.hash(data.password),
+        password_hash=password_hash,
     )
-    db.add(v); db.commit(); db.refresh(v)
+    db.add(v); await db.commit(); await db.refresh(v)
     return {"access_token": create_token(str(v.id), "visitor")}
 
 @router.post("/visitor/login")
-def visitor_login(data: VisitorLoginIn, db: Session = Depends(get_db)):
+async def visitor_login(
+    data: VisitorLoginIn,
+    background: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_read_db),
+):
     try:
         kind, value = data.normalized()
     except ValueError as e:
         raise HTTPException(422, str(e))
 
     if kind == "email":
-        v = db.query(Visitor).filter(Visitor.email == value).first()
+        v = await db.scalar(select(Visitor).where(Visitor.email == value).limit(1))
     else:
-        v = db.query(Visitor).filter(Visitor.phone == value).first()
+        v = await db.scalar(select(Visitor).where(Visitor.phone == value).limit(1))
+    await db.commit()  # end the read transaction; the connection goes back to the pool while hashing
 
-    if not v or not hasher.verify(data.password, v.password_hash):
+    if not v or not await hash_service.verify(data.password, v.password_hash):
         raise HTTPException(401, "Invalid credentials")
+    if hash_service.needs_rehash(v.password_hash):
+        background.add_task(upgrade_password_hash, Visitor, v.id, data.password)
 
     return {"access_token": create_token(str(v.id), "visitor")}
 
 @router.get("/me")
-def me(db: Session = Depends(get_db), me=Depends(get_current)):
+async def me(db: AsyncSession = Depends(get_async_read_db), me=Depends(get_current)):
     if me["role"] == "visitor":
-        v = db.get(Visitor, int(me["sub"]))
-        if not v:
-            raise HTTPException(404, "Visitor not found")
-        return {"id": v.id, "name": v.name, "phone": v.phone, "org": v.org, "email": v.email}
+        return await visitor_principal(db, int(me["sub"]))
     return {"role": me["role"], "sub": me["sub"]}
 
 
 @router.post("/admin/login")
-def admin_login(data: AdminLoginIn, db: Session = Depends(get_db)):
-    admin = db.query(Admin).filter(Admin.username == data.username).first()
-    if not admin or not hasher.verify(data.password, admin.password_hash):
+async def admin_login(
+    data: AdminLoginIn,
+    background: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    admin = await db.scalar(select(Admin).where(Admin.username == data.username).limit(1))
+    await db.commit()  # end the read transaction; the connection goes back to the pool while hashing
+    if not admin or not await hash_service.verify(data.password, admin.password_hash):
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    if hash_service.needs_rehash(admin.password_hash):
+        background.add_task(upgrade_password_hash, Admin, admin.id, data.password)
     role = admin.role or "admin"
     if admin.username.strip().lower() == "root":
         role = "superadmin"
-    pending_count = db.query(Reservation).filter(Reservation.status == "pending").count()
     token = create_token(admin.username, admin.role)
 
     need_profile = not (admin.email and admin.phone and admin.org and admin.work_address)
@@ -80,62 +129,71 @@ def admin_login(data: AdminLoginIn, db: Session = Depends(get_db)):
         "access_token": token,
         "token_type": "bearer",
         "need_profile": need_profile,
-        "pending_reservations": pending_count,
+        "pending_reservations": admin_summary.pending(),
         "role": admin.role
     }
 
 @router.post("/visitor/password/reset")
-def visitor_reset_password(data: VisitorResetPasswordIn, db: Session = Depends(get_db)):
-    v = db.query(Visitor).filter(
+async def visitor_reset_password(data: VisitorResetPasswordIn, db: AsyncSession = Depends(get_async_db)):
+    v = await db.scalar(select(Visitor).where(
         Visitor.email == data.email,
         Visitor.phone == data.phone
-    ).first()
+    ).limit(1))
     if not v:
         raise HTTPException(404, "Visitor not found by email+phone")
+    # unknown accounts are rejected above, before they can occupy the hash pool
+    await db.commit()  # end the read transaction; the connection goes back to the pool while hashing
 
-    v.password_hash = hasher.hash(data.new_password)
-    db.commit()
+    v.password_hash = await hash_service.hash(data.new_password)
+    await db.commit()
     return {"ok": True}
 
 
 @router.put("/visitor/profile")
-def update_visitor_profile(
+async def update_visitor_profile(
     data: VisitorUpdateIn,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     me=Depends(get_current)
 ):
     if me["role"] != "visitor":
         raise HTTPException(403, "Only visitor can update profile")
 
-    v = db.get(Visitor, int(me["sub"]))
+    v = await db.get(Visitor, int(me["sub"]))
     if not v:
         raise HTTPException(404, "Visitor not found")
+    email = data.email.strip().lower() if data.email else None
+    phone = data.phone.strip() if data.phone else None
 
-    
-    if data.name:
-        v.name = data.name.strip() 
+    async def check_unique():
+        if email and await db.scalar(select(Visitor).where(Visitor.email == email, Visitor.id != v.id).limit(1)):
+            raise HTTPException(400, "Email already used")
+        if phone and await db.scalar(select(Visitor).where(Visitor.phone == phone, Visitor.id != v.id).limit(1)):
+            raise HTTPException(400, "Phone already used")
 
+    # rejections first, so they never take a hash-pool slot
+    await check_unique()
+    password_hash = None
+    if data.new_password:
+        await db.commit()  # end the transaction; the write connection is not held while hashing
+        password_hash = await hash_service.hash(data.new_password)
+        await check_unique()  # again, in the transaction that writes
 
-    if data.email:
-        email = data.email.strip().lower()
-        if db.query(Visitor).filter(Visitor.email == email, Visitor.id != v.id).first():
-            raise HTTPException(400, "Email already used")
+    if data.name:
+        v.name = data.name.strip() 
+    if email:
         v.email = email
-
-    if data.phone:
-        phone = data.phone.strip()
-        if db.query(Visitor).filter(Visitor.phone == phone, Visitor.id != v.id).first():
-            raise HTTPException(400, "Phone already used")
+    if phone:
         v.phone = phone
 
     if data.org is not None:
         v.org = data.org.strip() or None  
 
-    if data.new_password:
-        v.password_hash = hasher.hash(data.new_password)
+    if password_hash:
+        v.password_hash = password_hash
 
-    db.commit()
-    db.refresh(v)
+    await db.commit()
+    await db.refresh(v)
+    principal_cache.pop(("visitor", v.id))
 
     return {
         "ok": True,
@@ -147,23 +205,20 @@ def update_visitor_profile(
         }
     }
 @router.get("/admin/profile", response_model=AdminProfileOut)
-def admin_profile(me=Depends(get_current), db: Session = Depends(get_db)):
+async def admin_profile(me=Depends(get_current), db: AsyncSession = Depends(get_async_read_db)):
     if me["role"] not in ("admin", "superadmin"):
         raise HTTPException(403, "Only admin can view profile")
-    admin = db.query(Admin).filter(Admin.username == me["sub"]).first()
-    if not admin:
-        raise HTTPException(404, "Admin not found")
-    return admin
+    return await admin_principal(db, me["sub"])
 
 @router.put("/admin/profile", response_model=AdminProfileOut)
-def admin_profile_update(
+async def admin_profile_update(
     data: AdminProfileIn,
     me=Depends(get_current),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     if me["role"] not in ("admin", "superadmin"):
         raise HTTPException(403, "Only admin can update profile")
-    admin = db.query(Admin).filter(Admin.username == me["sub"]).first()
+    admin = await db.scalar(select(Admin).where(Admin.username == me["sub"]).limit(1))
     if not admin:
         raise HTTPException(404, "Admin not found")
 
@@ -171,7 +226,7 @@ def admin_profile_update(
         email = data.email.strip().lower()
         if not re.match(r"^[^@\s]+@[^@\s]+\.[^@\s]+$", email):
             raise HTTPException(422, "The email format is invalid")
-        if db.query(Admin).filter(Admin.email == email, Admin.id != admin.id).first():
+        if await db.scalar(select(Admin).where(Admin.email == email, Admin.id != admin.id).limit(1)):
             raise HTTPException(400, "Email already used")
         admin.email = email
 
@@ -179,7 +234,7 @@ def admin_profile_update(
         phone = data.phone.strip()
         if not re.match(r"^\d{11}$", phone):
             raise HTTPException(422, "The phone format is invalid")
-        if db.query(Admin).filter(Admin.phone == phone, Admin.id != admin.id).first():
+        if await db.scalar(select(Admin).where(Admin.phone == phone, Admin.id != admin.id).limit(1)):
             raise HTTPException(400, "Phone already used")
         admin.phone = phone
 
@@ -190,44 +245,44 @@ def admin_profile_update(
     if data.display_name is not None:
         admin.display_name = data.display_name.strip() or None
 
-    db.commit()
-    db.refresh(admin)
+    await db.commit()
+    await db.refresh(admin)
+    principal_cache.pop(("admin", admin.username))
     return admin
 
 @router.post("/superadmin/admins", summary="Create a normal admin (superadmin only)")
-def superadmin_create_admin(
+async def superadmin_create_admin(
     data: AdminCreateIn,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     me = Depends(get_current)
 ):
     if me["role"] != "superadmin":
         raise HTTPException(403, "Only superadmin can create admins")
 
     username = data.username.strip()
-    if db.query(Admin).filter(Admin.username == username).first():
-        raise HTTPException(400, "Username already exists")
+
+    async def check_unique():
+        if await db.scalar(select(Admin).where(Admin.username == username).limit(1)):
+            raise HTTPException(400, "Username already exists")
+
+    # duplicates are rejected before they take a hash-pool slot
+    await check_unique()
+    await db.commit()  # end the transaction; the write connection is not held while hashing
+    password_hash = await hash_service.hash(data.password)
+    await check_unique()  # again, in the transaction that writes
 
     admin = Admin(
         username=username,
-        password_hash=hasher.hash(data.password),
+        password_hash=password_hash,
         role="admin"
     )
     db.add(admin)
-    db.commit()
-    db.refresh(admin)
+    await db.commit()
+    await db.refresh(admin)
     return {"ok": True, "id": admin.id, "username": admin.username, "role": admin.role}
 
 @router.get("/visitor/profile")
-def get_visitor_profile(db: Session = Depends(get_db), me=Depends(get_current)):
+async def get_visitor_profile(db: AsyncSession = Depends(get_async_read_db), me=Depends(get_current)):
     if me["role"] != "visitor":
         raise HTTPException(403, "Only visitor can view profile")
-    v = db.get(Visitor, int(me["sub"]))
-    if not v:
-        raise HTTPException(404, "Visitor not found")
-    return {
-        "id": v.id,
-        "name": v.name,
-        "phone": v.phone,
-        "org": v.org,
-        "email": v.email,
-    }
+    return await visitor_principal(db, int(me["sub"]))
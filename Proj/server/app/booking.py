@@ -0,0 +1,233 @@
+import threading
+from contextlib import contextmanager
+from datetime import datetime, date, time, timedelta
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from .models import Reservation
+
+ACTIVE_STATUSES = ("pending", "approved")
+
+
+class _DayTree:
+    # segment tree over the minutes of one business day: range add, range max
+    __slots__ = ("size", "mx", "add")
+
+    def __init__(self, minutes: int):
+        size = 1
+        while size < minutes:
+            size *= 2
+        self.size = size
+        self.mx = [0] * (2 * size)
+        self.add = [0] * (2 * size)
+
+    def update(self, lo: int, hi: int, delta: int):
+        self._update(1, 0, self.size, lo, hi, delta)
+
+    def peak(self, lo: int, hi: int) -> int:
+        return self._query(1, 0, self.size, lo, hi)
+
+    def runs_at_least(self, limit: int, minutes: int) -> list[tuple[int, int]]:
+        """Maximal [lo, hi) runs within [0, minutes) whose value is >= limit."""
+        out: list[tuple[int, int]] = []
+        if self.mx[1] >= limit:
+            self._collect(1, 0, self.size, limit, 0, minutes, out)
+        return out
+
+    def _collect(self, node, nl, nr, limit, above, minutes, out):
+        # above = pending adds of the ancestors; prune subtrees whose max stays below limit
+        if nl >= minutes or self.mx[node] + above < limit:
+            return
+        if nr - nl == 1:
+            if out and out[-1][1] == nl:
+                out[-1] = (out[-1][0], nr)
+            else:
+                out.append((nl, nr))
+            return
+        mid = (nl + nr) // 2
+        above += self.add[node]
+        self._collect(2 * node, nl, mid, limit, above, minutes, out)
+        self._collect(2 * node + 1, mid, nr, limit, above, minutes, out)
+
+    def _update(self, node, nl, nr, lo, hi, delta):
+        if hi <= nl or nr <= lo:
+            return
+        if lo <= nl and nr <= hi:
+            self.mx[node] += delta
+            self.add[node] += delta
+            return
+        mid = (nl + nr) // 2
+        self._update(2 * node, nl, mid, lo, hi, delta)
+        self._update(2 * node + 1, mid, nr, lo, hi, delta)
+        self.mx[node] = max(self.mx[2 * node], self.mx[2 * node + 1]) + self.add[node]
+
+    def _query(self, node, nl, nr, lo, hi):
+        if hi <= nl or nr <= lo:
+            return 0
+        if lo <= nl and nr <= hi:
+            return self.mx[node]
+        mid = (nl + nr) // 2
+        return max(
+            self._query(2 * node, nl, mid, lo, hi),
+            self._query(2 * node + 1, mid, nr, lo, hi),
+        ) + self.add[node]
+
+
+class BookingIndex:
+    """Per-(location_id, day) occupancy of active (pending/approved) reservations.
+
+    Days from the last rebuild onward are fully known in memory; older days are
+    loaded from the database by ``prepare`` the first time they are touched.
+
+    With ``reload`` (SQLite), ``prepare`` re-reads every slot it is given. It is
+    called inside write transactions, which on SQLite hold the database write lock
+    (BEGIN IMMEDIATE) and are this process's only one, so the count includes
+    bookings committed by other workers and capacity holds across processes.
+    """
+
+    def __init__(self, day_start: time, day_end: time, reload: bool = False):
+        self.day_start = day_start.hour * 60 + day_start.minute
+        self.minutes = day_end.hour * 60 + day_end.minute - self.day_start
+        self.reload = reload
+        self._days: dict[tuple[int, date], _DayTree] = {}
+        self._known_from: date | None = None
+        self._lock = threading.Lock()
+
+    def _span(self, start: datetime, end: datetime) -> tuple[int, int]:
+        lo = start.hour * 60 + start.minute - self.day_start
+        hi = end.hour * 60 + end.minute - self.day_start
+        if end.date() > start.date():
+            hi = self.minutes
+        return max(lo, 0), min(hi, self.minutes)
+
+    def _apply(self, location_id: int, start: datetime, end: datetime, delta: int):
+        tree = self._tree(location_id, start.date())
+        lo, hi = self._span(start, end)
+        if lo < hi:
+            tree.update(lo, hi, delta)
+
+    def _tree(self, location_id: int, day: date) -> _DayTree:
+        tree = self._days.get((location_id, day))
+        if tree is None:
+            tree = self._days[(location_id, day)] = _DayTree(self.minutes)
+        return tree
+
+    def _needs_load(self, location_id: int, day: date) -> bool:
+        if (location_id, day) in self._days:
+            return False
+        return self._known_from is None or day < self._known_from
+
+    async def prepare(self, db: AsyncSession, *slots: tuple[int, date]):
+        """Load the (location_id, day) slots that predate the last rebuild (all of them with ``reload``)."""
+        for location_id, day in slots:
+            if not self.reload and not self._needs_load(location_id, day):
+                continue
+            day_start = datetime.combine(day, time.min)
+            rows = (await db.execute(
+                select(Reservation.start_time, Reservation.end_time).where(
+                    Reservation.location_id == location_id,
+                    Reservation.start_time >= day_start,
+                    Reservation.start_time < day_start + timedelta(days=1),
+                    Reservation.status.in_(ACTIVE_STATUSES),
+                )
+            )).all()
+            with self._lock:
+                if self.reload:
+                    tree = self._days[(location_id, day)] = _DayTree(self.minutes)
+                elif (location_id, day) in self._days:
+                    continue
+                else:
+                    tree = self._tree(location_id, day)
+                for s, e in rows:
+                    lo, hi = self._span(s, e)
+                    if lo < hi:
+                        tree.update(lo, hi, 1)
+
+    def rebuild(self, db: Session, since: date | None = None):
+        since = since or date.today()
+        rows = (
+            db.query(Reservation.location_id, Reservation.start_time, Reservation.end_time)
+            .filter(
+                Reservation.location_id.isnot(None),
+                Reservation.start_time >= datetime.combine(since, time.min),
+                Reservation.status.in_(ACTIVE_STATUSES),
+            )
+            .all()
+        )
+        with self._lock:
+            self._days = {}
+            for loc_id, s, e in rows:
+                self._apply(loc_id, s, e, 1)
+            self._known_from = since
+
+    def peak(self, location_id: int, start: datetime, end: datetime) -> int:
+        with self._lock:
+            tree = self._tree(location_id, start.date())
+            lo, hi = self._span(start, end)
+            return tree.peak(lo, hi) if lo < hi else 0
+
+    def free_windows(
+        self, location_id: int, day: date, capacity: int, min_minutes: int, not_before: int = 0,
+    ) -> list[tuple[int, int]]:
+        """[lo, hi) minute offsets from the day start where a booking of
+        ``min_minutes`` fits under ``capacity``. Untouched days cost a dict lookup,
+        days that never reach capacity a root read; only full minutes are walked.
+        """
+        with self._lock:
+            tree = self._days.get((location_id, day))
+            full = tree.runs_at_least(capacity, self.minutes) if tree is not None else []
+        windows = []
+        cursor = not_before
+        for lo, hi in full + [(self.minutes, self.minutes)]:
+            if lo - cursor >= min_minutes:
+                windows.append((cursor, lo))
+            cursor = max(cursor, hi)
+        return windows
+
+    @contextmanager
+    def claim(
+        self,
+        location_id: int,
+        start: datetime,
+        end: datetime,
+        capacity: int,
+        replacing: tuple[int, datetime, datetime] | None = None,
+    ):
+        """Reserve a slot for the duration of the block (typically the commit).
+
+        The slot is held as soon as the check passes so that concurrent requests
+        see it; it is given back if the block raises. ``replacing`` is the
+        (location_id, start, end) of the booking being moved by an update.
+        Both days must have been through ``prepare`` first.
+        """
+        with self._lock:
+            if replacing:
+                self._apply(*replacing, -1)
+            tree = self._tree(location_id, start.date())
+            lo, hi = self._span(start, end)
+            if lo < hi and tree.peak(lo, hi) >= capacity:
+                if replacing:
+                    self._apply(*replacing, 1)
+                raise HTTPException(409, "The selected time slot is fully booked at this location")
+            self._apply(location_id, start, end, 1)
+        try:
+            yield
+        except BaseException:
+            with self._lock:
+                self._apply(location_id, start, end, -1)
+                if replacing:
+                    self._apply(*replacing, 1)
+            raise
+
+    def release(self, location_id: int | None, start: datetime, end: datetime):
+        if location_id is None:
+            return
+        with self._lock:
+            if (location_id, start.date()) in self._days:
+                self._apply(location_id, start, end, -1)
+
+    def drop_location(self, location_id: int):
+        with self._lock:
+            for key in [k for k in self._days if k[0] == location_id]:
+                del self._days[key]
@@ -0,0 +1,86 @@
+import asyncio
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+
+
+class Subscription:
+    def __init__(self, maxsize: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self.overflowed = False
+
+    async def get(self, timeout: float):
+        """Next event, or None on timeout. Raises ``ConnectionResetError`` once overflowed or closed."""
+        if self.overflowed:
+            raise ConnectionResetError
+        try:
+            event = await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        if event is None:
+            raise ConnectionResetError
+        return event
+
+
+class Broker(ABC):
+    """Topic pub/sub used to push events to open streams.
+
+    Delivery is best effort: the database stays the source of truth and
+    subscribers catch up from it (e.g. after a reconnect with Last-Event-ID).
+    Backends must implement ``publish`` and ``subscribe``; one missing either
+    fails when it is instantiated.
+    """
+
+    @abstractmethod
+    async def publish(self, topic: str, event: dict):
+        ...
+
+    @abstractmethod
+    def subscribe(self, topic: str):
+        """Async context manager yielding a ``Subscription``."""
+
+    async def close(self):
+        pass
+
+
+class InProcessBroker(Broker):
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._topics: dict[str, set[Subscription]] = {}
+
+    async def publish(self, topic: str, event: dict):
+        for sub in list(self._topics.get(topic, ())):
+            try:
+                sub.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # slow consumer: end its stream, it resumes from the database
+                sub.overflowed = True
+
+    @asynccontextmanager
+    async def subscribe(self, topic: str):
+        sub = Subscription(self.queue_size)
+        self._topics.setdefault(topic, set()).add(sub)
+        try:
+            yield sub
+        finally:
+            subs = self._topics.get(topic)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._topics[topic]
+
+    def subscriber_count(self, topic: str | None = None) -> int:
+        if topic is not None:
+            return len(self._topics.get(topic, ()))
+        return sum(len(s) for s in self._topics.values())
+
+    async def close(self):
+        for subs in self._topics.values():
+            for sub in subs:
+                sub.overflowed = True
+                try:
+                    sub.queue.put_nowait(None)
+                except asyncio.QueueFull:
+                    pass
+
+
+broker = InProcessBroker()
@@ -0,0 +1,43 @@
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """Small LRU cache whose entries also expire at a given wall-clock time.
+
+    Only used from the event loop, so there is no locking.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+
+    def get(self, key):
+        item = self._data.get(key)
+        if item is None:
+            return None
+        value, expires_at = item
+        if expires_at <= time.time():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def put(self, key, value, expires_at: float | None = None):
+        if self.maxsize <= 0:
+            return
+        limit = time.time() + self.ttl
+        self._data[key] = (value, limit if expires_at is None else min(expires_at, limit))
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
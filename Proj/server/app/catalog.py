@@ -0,0 +1,118 @@
+import asyncio
+import hashlib
+import json
+import logging
+from typing import NamedTuple
+from fastapi import Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from .database import AsyncReadSessionLocal
+from .models import Location
+from .settings import CATALOG_REFRESH_SECONDS
+
+log = logging.getLogger(__name__)
+
+class CatalogLocation(NamedTuple):
+    id: int
+    campus: str
+    name: str
+    is_active: int
+    capacity: int | None
+
+
+class LocationCatalog:
+    """Process-local snapshot of the ``location`` table.
+
+    Every superadmin mutation calls ``refresh`` after committing, which reloads
+    the table and bumps ``version``; the background task re-reads it every
+    ``refresh_seconds`` so edits made through other processes show up too. The
+    public listings are serialized once per version and served with a strong ETag.
+    """
+
+    def __init__(self, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self.version = 0
+        self._task: asyncio.Task | None = None
+        self._by_id: dict[int, CatalogLocation] = {}
+        self._ordered: list[CatalogLocation] = []
+        self._bodies: dict[str, tuple[bytes, str]] = {}
+
+    def _query(self):
+        return select(
+            Location.id, Location.campus, Location.name, Location.is_active, Location.capacity
+        ).order_by(Location.campus, Location.name)
+
+    def _set(self, rows):
+        ordered = [CatalogLocation(*r) for r in rows]
+        if ordered == self._ordered:
+            return
+        self._ordered = ordered
+        self._by_id = {loc.id: loc for loc in ordered}
+        self._bodies = {}
+        self.version += 1
+
+    def load(self, db: Session):
+        self._set(db.execute(self._query()).all())
+
+    async def refresh(self, db: AsyncSession):
+        self._set((await db.execute(self._query())).all())
+
+    def get(self, location_id: int) -> CatalogLocation | None:
+        return self._by_id.get(location_id)
+
+    def active(self) -> list[CatalogLocation]:
+        return [loc for loc in self._ordered if loc.is_active == 1]
+
+    def all(self) -> list[CatalogLocation]:
+        return list(self._ordered)
+
+    def _render(self, kind: str) -> tuple[bytes, str]:
+        if kind == "grouped":
+            data = {"LOWER": [], "MIDDLE": [], "UPPER": []}
+            for loc in self.active():
+                data.setdefault(loc.campus, []).append({"id": loc.id, "name": loc.name})
+        elif kind == "flat":
+            data = [{"id": loc.id, "campus": loc.campus, "name": loc.name} for loc in self.active()]
+        else:
+            data = [loc._asdict() for loc in self._ordered]
+        body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return body, '"%s"' % hashlib.sha256(body).hexdigest()[:32]
+
+    def response(self, kind: str, request: Request) -> Response:
+        """``kind`` is ``grouped``, ``flat`` or ``all``; answers 304 when the ETag matches."""
+        cached = self._bodies.get(kind)
+        if cached is None:
+            cached = self._bodies[kind] = self._render(kind)
+        body, etag = cached
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        inm = request.headers.get("if-none-match")
+        if inm and (inm.strip() == "*" or etag in [t.strip() for t in inm.split(",")]):
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.refresh_seconds)
+            try:
+                async with AsyncReadSessionLocal() as db:
+                    await self.refresh(db)
+            except Exception:
+                log.exception("location catalog refresh failed")
+
+    def start(self):
+        if self._task is None and self.refresh_seconds > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+location_catalog = LocationCatalog(CATALOG_REFRESH_SECONDS)
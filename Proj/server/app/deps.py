@@ -1,10 +1,21 @@
 from sqlalchemy.orm import Session
-from .database import SessionLocal
-from fastapi import Depends, Header, HTTPException,Security
+from .database import SessionLocal, AsyncSessionLocal, AsyncReadSessionLocal
+from fastapi import Depends, Header, HTTPException, Query, Security
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, JWTError
-from .settings import JWT_SECRET, JWT_ALGO
+import hashlib
+from .cache import TTLCache
+from .settings import (
+    JWT_SECRET, JWT_ALGO,
+    TOKEN_CACHE_SIZE, TOKEN_CACHE_TTL, PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL,
+)
 security = HTTPBearer(auto_error=False)
+
+# sha256(token) -> decoded payload
+token_cache = TTLCache(TOKEN_CACHE_SIZE, TOKEN_CACHE_TTL)
+# ("visitor", id) / ("admin", username) -> profile dict
+principal_cache = TTLCache(PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL)
+
 def get_db():
     db: Session = SessionLocal()
     try:
@@ -12,12 +23,36 @@ def get_db():
     finally:
         db.close()
 
-def get_current(credentials: HTTPAuthorizationCredentials = Security(security)):
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def get_async_read_db():
+    async with AsyncReadSessionLocal() as db:
+        yield db
+
+def decode_token(token: str) -> dict:
+    key = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(key)
+    if payload is None:
+        try:
+            payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGO])
+        except JWTError:
+            raise HTTPException(status_code=401, detail="Invalid token")
+        token_cache.put(key, payload, expires_at=payload.get("exp"))
+    return payload
+
+async def get_current(credentials: HTTPAuthorizationCredentials = Security(security)):
     if not credentials:
         raise HTTPException(status_code=401, detail="Missing token")
-    token = credentials.credentials
-    try:
-        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGO])
-    except JWTError:
-        raise HTTPException(status_code=401, detail="Invalid token")
-    return payload
\ No newline at end of file
+    return decode_token(credentials.credentials)
+
+async def get_current_stream(
+    credentials: HTTPAuthorizationCredentials = Security(security),
+    token: str | None = Query(None, description="Bearer token for clients that cannot set headers (EventSource)"),
+):
+    if credentials:
+        return decode_token(credentials.credentials)
+    if not token:
+        raise HTTPException(status_code=401, detail="Missing token")
+    return decode_token(token)
@@ -0,0 +1,74 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from passlib.hash import pbkdf2_sha256
+from .settings import PASSWORD_HASH_ROUNDS, HASH_WORKERS, HASH_MAX_PENDING
+
+# worker-side functions must be module level so they can be pickled
+
+
+def _hash(password: str, rounds: int) -> str:
+    return pbkdf2_sha256.using(rounds=rounds).hash(password)
+
+
+def _verify(password: str, password_hash: str) -> bool:
+    return pbkdf2_sha256.verify(password, password_hash)
+
+
+class HashService:
+    """pbkdf2 hashing on a process pool with a bounded number of pending jobs.
+
+    Once ``max_pending`` jobs are queued or running, further calls fail fast with
+    503 instead of piling up behind the pool. ``workers=0`` runs the hashes on the
+    threadpool instead (useful for scripts and debugging).
+    """
+
+    def __init__(self, rounds: int, workers: int, max_pending: int):
+        self.rounds = rounds
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self._pool: ProcessPoolExecutor | None = None
+        self._policy = pbkdf2_sha256.using(rounds=rounds)
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._pool
+
+    async def _run(self, fn, *args):
+        if self.pending >= self.max_pending:
+            raise HTTPException(503, "Server is busy, please retry shortly", headers={"Retry-After": "1"})
+        self.pending += 1
+        try:
+            if self.workers <= 0:
+                return await run_in_threadpool(fn, *args)
+            return await asyncio.get_running_loop().run_in_executor(self._executor(), fn, *args)
+        finally:
+            self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(_hash, password, self.rounds)
+
+    async def verify(self, password: str, password_hash: str) -> bool:
+        return await self._run(_verify, password, password_hash)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        return self._policy.needs_update(password_hash)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+hash_service = HashService(
+    rounds=PASSWORD_HASH_ROUNDS,
+    workers=HASH_WORKERS,
+    max_pending=HASH_MAX_PENDING,
+)
@@ -1,27 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from .deps import get_db, get_current
-from .models import Location
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from .deps import get_async_db, get_current
+from .models import Location, Reservation
 from .schemas import CampusEnum,LocationCreateIn, LocationUpdateIn, LocationAdminOut
-from sqlalchemy import and_
+from .reservations import booking_index
+from .catalog import location_catalog
+from . import rollups
+from sqlalchemy import and_, select
 router = APIRouter()
 
 @router.get("/", summary="Filtered locations grouped by campus")
-def list_locations(db: Session = Depends(get_db)):
-    rows = db.query(Location).filter(Location.is_active == 1).order_by(Location.campus, Location.name).all()
-    grouped = {"LOWER": [], "MIDDLE": [], "UPPER": []}
-    for r in rows:
-        grouped.setdefault(r.campus, []).append({"id": r.id, "name": r.name})
-    return grouped
+async def list_locations(request: Request):
+    return location_catalog.response("grouped", request)
 
 @router.get("/flat", summary="Flat list of active locations")
-def list_locations_flat(db: Session = Depends(get_db)):
-    rows = db.query(Location).filter(Location.is_active == 1).order_by(Location.campus, Location.name).all()
-    return [{"id": r.id, "campus": r.campus, "name": r.name} for r in rows]
+async def list_locations_flat(request: Request):
+    return location_catalog.response("flat", request)
 
 
 @router.get("/campus", response_model=list[str])
-def list_campus():
+async def list_campus():
     return [c.value for c in CampusEnum]
 
 def _ensure_superadmin(me):
@@ -29,18 +27,17 @@ def _ensure_superadmin(me):
         raise HTTPException(403, "Only superadmin can manage locations")
 
 @router.get("/admin/all", response_model=list[LocationAdminOut], summary="List all locations (superadmin only)")
-def admin_list_all_locations(
-    db: Session = Depends(get_db),
+async def admin_list_all_locations(
+    request: Request,
     me = Depends(get_current),
 ):
     _ensure_superadmin(me)
-    rows = db.query(Location).order_by(Location.campus, Location.name).all()
-    return rows
+    return location_catalog.response("all", request)
 
 @router.post("/admin", response_model=LocationAdminOut, summary="(superadmin) Create a new location")
-def admin_create_location(
+async def admin_create_location(
     data: LocationCreateIn,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     me = Depends(get_current),
 ):
     _ensure_superadmin(me)
@@ -49,28 +46,29 @@ def admin_create_location(
     if not name:
         raise HTTPException(422, "name must not be empty")
 
-    exists = db.query(Location).filter(
+    exists = await db.scalar(select(Location).where(
         and_(Location.campus == campus, Location.name == name)
-    ).first()
+    ).limit(1))
     if exists:
         raise HTTPException(400, "A location with the same name already exists in this campus")
 
-    loc = Location(campus=campus, name=name, is_active=1)
+    loc = Location(campus=campus, name=name, is_active=1, capacity=data.capacity)
     db.add(loc)
-    db.commit()
-    db.refresh(loc)
+    await db.commit()
+    await db.refresh(loc)
+    await location_catalog.refresh(db)
     return loc
 
 @router.put("/admin/{loc_id}", response_model=LocationAdminOut, summary="(superadmin) Update a location")
-def admin_update_location(
+async def admin_update_location(
     loc_id: int,
     data: LocationUpdateIn,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     me = Depends(get_current),
 ):
     _ensure_superadmin(me)
 
-    loc = db.get(Location, loc_id)
+    loc = await db.get(Location, loc_id)
     if not loc:
         raise HTTPException(404, "Location not found")
 
@@ -83,43 +81,51 @@ def admin_update_location(
         loc.name = new_name
     if data.is_active is not None:
         loc.is_active = 1 if data.is_active else 0
+    if data.capacity is not None:
+        loc.capacity = data.capacity
 
-    dup = db.query(Location).filter(
+    dup = await db.scalar(select(Location).where(
         and_(Location.campus == loc.campus, Location.name == loc.name, Location.id != loc.id)
-    ).first()
+    ).limit(1))
     if dup:
         raise HTTPException(400, "A location with the same name already exists in this campus")
 
-    db.commit()
-    db.refresh(loc)
+    await db.commit()
+    await db.refresh(loc)
+    await location_catalog.refresh(db)
     return loc
 
 @router.patch("/admin/{loc_id}/active", summary="(superadmin) Enable/Disable location")
-def admin_toggle_location(
+async def admin_toggle_location(
     loc_id: int,
     is_active: bool = Query(..., description="true=Enable, false=Disable"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     me = Depends(get_current),
 ):
     _ensure_superadmin(me)
-    loc = db.get(Location, loc_id)
+    loc = await db.get(Location, loc_id)
     if not loc:
         raise HTTPException(404, "Location not found")
 
     loc.is_active = 1 if is_active else 0
-    db.commit()
+    await db.commit()
+    await location_catalog.refresh(db)
     return {"ok": True, "id": loc.id, "is_active": loc.is_active}
 
 @router.delete("/admin/{loc_id}", summary="(superadmin) Delete a location")
-def admin_delete_location(
+async def admin_delete_location(
     loc_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     me = Depends(get_current),
 ):
     _ensure_superadmin(me)
-    loc = db.get(Location, loc_id)
+    loc = await db.get(Location, loc_id)
     if not loc:
         raise HTTPException(404, "Location not found")
-    db.delete(loc)
-    db.commit()
+    for r in (await db.scalars(select(Reservation).where(Reservation.location_id == loc_id))).all():
+        await rollups.track_reservation(db, r, -1)
+    await db.delete(loc)
+    await db.commit()
+    booking_index.drop_location(loc_id)
+    await location_catalog.refresh(db)
     return {"ok": True}
\ No newline at end of file
@@ -1,13 +1,24 @@
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 
-from .database import Base, engine
+from .database import Base, engine, SessionLocal, async_engine, async_read_engine
 from .auth import router as auth_router
-from .reservations import router as reservation_router
+from .reservations import router as reservation_router, booking_index
 from .locations import router as locations_router
 from .notifications import router as notifications_router  
+from . import rollups
+from .hashing import hash_service
+from .catalog import location_catalog
+from .broker import broker
+from .outbox import outbox
+from .writer import writer
+from .summary import admin_summary
+from .settings import METRICS_ENABLED, OUTBOX_DISPATCHER
+from .responses import DefaultResponse
+from .metrics import MetricsMiddleware, instrument_engine, metrics
 
-app = FastAPI(title="VMS API", version="0.1.0")
+app = FastAPI(title="VMS API", version="0.1.0", default_response_class=DefaultResponse)
 
 app.include_router(auth_router,          prefix="/auth",          tags=["auth"])
 app.include_router(reservation_router,   prefix="/reservations",  tags=["reservations"])
@@ -21,12 +32,52 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    for e in (async_engine.sync_engine, async_read_engine.sync_engine):
+        instrument_engine(e)
+
+    @app.get("/metrics", include_in_schema=False)
+    async def prometheus_metrics():
+        return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 @app.on_event("startup")
 def on_startup():
     Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        if rollups.needs_backfill(db):
+            rollups.backfill(db)
+        if rollups.unread_needs_backfill(db):
+            rollups.reconcile_unread(db)
+        booking_index.rebuild(db)
+        location_catalog.load(db)
+        admin_summary.load(db)
+    finally:
+        db.close()
+
+@app.on_event("startup")
+async def start_workers():
+    writer.start()
+    admin_summary.start()
+    location_catalog.start()
+    if OUTBOX_DISPATCHER:
+        outbox.start()
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await writer.stop()
+    await admin_summary.stop()
+    await location_catalog.stop()
+    await outbox.stop()
+    await broker.close()
+    await async_engine.dispose()
+    await async_read_engine.dispose()
+    hash_service.shutdown()
 
 @app.get("/health")
-def health():
+async def health():
     return {"ok": True}
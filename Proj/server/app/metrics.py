@@ -0,0 +1,157 @@
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from sqlalchemy import event
+
+# Request/DB metrics in Prometheus text format, without a client library.
+# Everything runs on the event loop thread, so plain dicts are enough.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class RequestStats:
+    __slots__ = ("statements", "db_seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+
+
+_current: ContextVar[RequestStats | None] = ContextVar("vms_request_stats", default=None)
+
+
+class Metrics:
+    def __init__(self):
+        self.in_flight = 0
+        self.requests: dict[tuple[str, str, str], int] = {}
+        self.latency: dict[tuple[str, str], Histogram] = {}
+        self.statements: dict[tuple[str, str], Histogram] = {}
+        self.db_seconds: dict[tuple[str, str], float] = {}
+
+    def record(self, method: str, route: str, status: int, seconds: float, stats: RequestStats):
+        key = (method, route)
+        rkey = (method, route, str(status))
+        self.requests[rkey] = self.requests.get(rkey, 0) + 1
+        hist = self.latency.get(key)
+        if hist is None:
+            hist = self.latency[key] = Histogram(LATENCY_BUCKETS)
+            self.statements[key] = Histogram(STATEMENT_BUCKETS)
+            self.db_seconds[key] = 0.0
+        hist.observe(seconds)
+        self.statements[key].observe(stats.statements)
+        self.db_seconds[key] += stats.db_seconds
+
+    def render(self) -> str:
+        out = [
+            "# HELP vms_http_requests_in_flight Requests currently being served.",
+            "# TYPE vms_http_requests_in_flight gauge",
+            f"vms_http_requests_in_flight {self.in_flight}",
+            "# HELP vms_http_requests_total Completed requests by route and status.",
+            "# TYPE vms_http_requests_total counter",
+        ]
+        for (method, route, status), n in sorted(self.requests.items()):
+            out.append(f'vms_http_requests_total{{method="{method}",route="{route}",status="{status}"}} {n}')
+        _histograms(out, "vms_http_request_duration_seconds", "Request latency.", self.latency)
+        _histograms(out, "vms_db_statements_per_request", "SQL statements executed per request.", self.statements)
+        out += [
+            "# HELP vms_db_seconds_total Time spent executing SQL, by route.",
+            "# TYPE vms_db_seconds_total counter",
+        ]
+        for (method, route), seconds in sorted(self.db_seconds.items()):
+            out.append(f'vms_db_seconds_total{{method="{method}",route="{route}"}} {seconds:.6f}')
+        return "\n".join(out) + "\n"
+
+
+def _histograms(out: list[str], name: str, help_text: str, series: dict):
+    out += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for (method, route), h in sorted(series.items()):
+        labels = f'method="{method}",route="{route}"'
+        cumulative = 0
+        for bound, n in zip(h.buckets, h.counts):
+            cumulative += n
+            out.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        out.append(f'{name}_bucket{{{labels},le="+Inf"}} {h.count}')
+        out.append(f"{name}_sum{{{labels}}} {h.sum:.6f}")
+        out.append(f"{name}_count{{{labels}}} {h.count}")
+
+
+metrics = Metrics()
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware: latency, status and SQL accounting per route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        metrics.in_flight += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            metrics.in_flight -= 1
+            _current.reset(token)
+            route = scope.get("route")
+            # unmatched paths share one label so random URLs cannot blow up cardinality
+            path = getattr(route, "path", None) or "unmatched"
+            metrics.record(scope["method"], path, status, time.perf_counter() - start, stats)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info["vms_query_start"] = time.perf_counter()
+
+
+def _finish_statement(conn):
+    # popped on success and on failure alike, so a failed statement is still timed and counted
+    start = conn.info.pop("vms_query_start", None)
+    stats = _current.get()
+    if start is None or stats is None:
+        return
+    stats.db_seconds += time.perf_counter() - start
+    stats.statements += 1
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _finish_statement(conn)
+
+
+def _handle_error(exception_context):
+    if exception_context.connection is not None:
+        _finish_statement(exception_context.connection)
+
+
+def instrument_engine(engine):
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
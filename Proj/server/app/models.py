@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, Enum
+from sqlalchemy import Column, Integer, String, DateTime, Date, ForeignKey, Index, Enum
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from .database import Base
@@ -24,7 +24,7 @@ class Visitor(Base):
     name = Column(String, nullable=False)
     phone = Column(String, unique=True, nullable=False, index=True)
     org = Column(String, nullable=True)
-    email = Column(String, nullable=True)
+    email = Column(String, nullable=True, index=True)
     password_hash = Column(String, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     reservations = relationship("Reservation", back_populates="visitor", cascade="all, delete-orphan")
@@ -66,6 +66,7 @@ class Location(Base):
     campus = Column(String, nullable=False, index=True)  
     name = Column(String, nullable=False, index=True)    
     is_active = Column(Integer, default=1)
+    capacity = Column(Integer, nullable=True)
     reservations = relationship("Reservation", back_populates="location_obj", cascade="all, delete-orphan")
 
     __table_args__ = (
@@ -76,7 +77,7 @@ class Notification(Base):
     __tablename__ = "notification"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    visitor_id = Column(Integer, ForeignKey("visitor.id", ondelete="CASCADE"), index=True, nullable=False)
+    visitor_id = Column(Integer, ForeignKey("visitor.id", ondelete="CASCADE"), nullable=False)
     type = Column(String(50), nullable=False)  
     reservation_id = Column(Integer, ForeignKey("reservation.id", ondelete="SET NULL"), nullable=True)
     title = Column(String(200), nullable=False)
@@ -87,5 +88,65 @@ class Notification(Base):
 
     visitor = relationship("Visitor", backref="notifications")
 
-Index("ix_resv_loc_time", Reservation.location, Reservation.start_time, Reservation.end_time)
-Index("ix_resv_status_date", Reservation.status, Reservation.start_time)
\ No newline at end of file
+class NotificationArchive(Base):
+    """Read notifications moved out of ``notification`` by archive_notifications.py."""
+    __tablename__ = "notification_archive"
+
+    id = Column(Integer, primary_key=True)  # the original notification id
+    visitor_id = Column(Integer, ForeignKey("visitor.id", ondelete="CASCADE"), nullable=False)
+    type = Column(String(50), nullable=False)
+    reservation_id = Column(Integer, nullable=True)
+    title = Column(String(200), nullable=False)
+    body = Column(String, nullable=True)
+    is_read = Column(Integer, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    archived_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+class ReservationRollup(Base):
+    __tablename__ = "reservation_rollup"
+
+    day = Column(Date, primary_key=True)
+    location_id = Column(Integer, primary_key=True)  # 0 = no location
+    status = Column(String(20), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+class VisitorDay(Base):
+    __tablename__ = "visitor_day"
+
+    day = Column(Date, primary_key=True)
+    visitor_id = Column(Integer, primary_key=True)
+    approved_count = Column(Integer, nullable=False, default=0)
+
+class VisitorDayTotal(Base):
+    __tablename__ = "visitor_day_total"
+
+    day = Column(Date, primary_key=True)
+    visitors = Column(Integer, nullable=False, default=0)
+
+class UnreadCounter(Base):
+    __tablename__ = "notification_unread"
+
+    visitor_id = Column(Integer, ForeignKey("visitor.id", ondelete="CASCADE"), primary_key=True)
+    unread = Column(Integer, nullable=False, default=0)
+
+class NotificationOutbox(Base):
+    __tablename__ = "notification_outbox"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    visitor_id = Column(Integer, ForeignKey("visitor.id", ondelete="CASCADE"), nullable=False)
+    payload = Column(String, nullable=False)  # JSON: the notification row to deliver
+    attempts = Column(Integer, nullable=False, default=0)
+    available_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    dispatched_at = Column(DateTime, nullable=True)
+    last_error = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+Index("ix_resv_locid_time", Reservation.location_id, Reservation.start_time, Reservation.end_time)
+Index("ix_resv_status_date", Reservation.status, Reservation.start_time)
+Index("ix_outbox_due", NotificationOutbox.dispatched_at, NotificationOutbox.available_at, NotificationOutbox.id)
+# inbox pages: all notifications newest first, and the unread-only view / read_all
+Index("ix_notif_visitor_created", Notification.visitor_id, Notification.created_at)
+Index("ix_notif_visitor_read_created", Notification.visitor_id, Notification.is_read, Notification.created_at)
+Index("ix_notif_archive_visitor_created", NotificationArchive.visitor_id, NotificationArchive.created_at)
+# distinct visitors over a date range: one index probe per visitor instead of scanning every visitor-day
+Index("ix_visitor_day_visitor_day", VisitorDay.visitor_id, VisitorDay.day)
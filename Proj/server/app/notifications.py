@@ -1,19 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, func, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
+import json
 
-from .deps import get_db, get_current
+from .database import AsyncReadSessionLocal
+from .deps import get_async_read_db, get_current, get_current_stream
 from .models import Notification
 from .schemas import NotificationOut, NotificationReadIn
+from .broker import broker
+from .responses import decode_cursor, encode_cursor, json_rows, rows_as_dicts
+from . import rollups
+from .writer import writer
+from .settings import NOTIFY_HEARTBEAT_SECONDS, NOTIFY_REPLAY_LIMIT
 
 router = APIRouter(prefix="/notifications", tags=["notifications"])
 
+# NotificationOut, in column order
+NOTIFICATION_OUT_FIELDS = ("id", "type", "reservation_id", "title", "body", "is_read", "created_at")
+
 @router.get("/", response_model=list[NotificationOut])
-def list_notifications(
+async def list_notifications(
+    response: Response,
     unread_only: bool = Query(False),
     limit: int = Query(50, ge=1, le=200),
-    offset: int = Query(0, ge=0),
-    db: Session = Depends(get_db),
+    cursor: str | None = Query(None, description="X-Next-Cursor header of the previous page"),
+    offset: int = Query(0, ge=0, deprecated=True),
+    db: AsyncSession = Depends(get_async_read_db),
     me = Depends(get_current),
 ):
     
@@ -24,53 +38,130 @@ def list_notifications(
         
         raise HTTPException(403, "Only visitor can view notifications")
 
-    q = db.query(Notification).filter(Notification.visitor_id == visitor_id)
+    q = select(*(getattr(Notification, f) for f in NOTIFICATION_OUT_FIELDS)).where(Notification.visitor_id == visitor_id)
     if unread_only:
-        q = q.filter(Notification.is_read == 0)
-    q = q.order_by(Notification.created_at.desc()).offset(offset).limit(limit)
-    return q.all()
+        q = q.where(Notification.is_read == 0)
+    if cursor:
+        before, before_id = decode_cursor(cursor)
+        # row-value comparison: SQLite seeks the (visitor_id, [is_read,] created_at) index to the cursor
+        q = q.where(tuple_(Notification.created_at, Notification.id) < tuple_(before, before_id))
+    elif offset:
+        q = q.offset(offset)
+    q = q.order_by(Notification.created_at.desc(), Notification.id.desc()).limit(limit)
+    rows = rows_as_dicts(NOTIFICATION_OUT_FIELDS, (await db.execute(q)).all())
+    out = json_rows(rows)
+    if len(rows) == limit:
+        # the body stays a plain list; the next page is requested with ?cursor=<this header>
+        (out if isinstance(out, Response) else response).headers["X-Next-Cursor"] = encode_cursor(
+            rows[-1]["created_at"], rows[-1]["id"])
+    return out
 
 @router.get("/unread_count")
-def unread_count(
-    db: Session = Depends(get_db),
+async def unread_count(
+    db: AsyncSession = Depends(get_async_read_db),
     me = Depends(get_current),
 ):
     if me["role"] != "visitor":
         raise HTTPException(403, "Only visitor can view unread count")
-    count = db.query(Notification).filter(
-        Notification.visitor_id == int(me["sub"]),
-        Notification.is_read == 0
-    ).count()
-    return {"unread": count}
+    return {"unread": await rollups.unread_count(db, int(me["sub"]))}
 
 @router.patch("/{nid}/read")
-def mark_read(
+async def mark_read(
     nid: int,
     data: NotificationReadIn,
-    db: Session = Depends(get_db),
     me = Depends(get_current),
 ):
     if me["role"] != "visitor":
         raise HTTPException(403, "Only visitor can mark read")
 
-    n = db.get(Notification, nid)
-    if not n or n.visitor_id != int(me["sub"]):
-        raise HTTPException(404, "Notification not found")
+    async def unit(db: AsyncSession, claims):
+        n = await db.get(Notification, nid)
+        if not n or n.visitor_id != int(me["sub"]):
+            raise HTTPException(404, "Notification not found")
+
+        is_read = 1 if data.is_read else 0
+        if n.is_read != is_read:
+            await rollups.track_unread(db, n.visitor_id, -1 if is_read else 1)
+        n.is_read = is_read
+        return {"ok": True, "id": n.id, "is_read": n.is_read}
 
-    n.is_read = 1 if data.is_read else 0
-    db.commit()
-    return {"ok": True, "id": n.id, "is_read": n.is_read}
+    return await writer.run(unit)
 
 @router.post("/read_all")
-def mark_all_read(
-    db: Session = Depends(get_db),
+async def mark_all_read(
     me = Depends(get_current),
 ):
     if me["role"] != "visitor":
         raise HTTPException(403, "Only visitor can mark read")
-    db.query(Notification).filter(
-        Notification.visitor_id == int(me["sub"]),
-        Notification.is_read == 0
-    ).update({"is_read": 1})
-    db.commit()
+
+    async def unit(db: AsyncSession, claims):
+        await db.execute(update(Notification).where(
+            Notification.visitor_id == int(me["sub"]),
+            Notification.is_read == 0
+        ).values(is_read=1))
+        await rollups.clear_unread(db, int(me["sub"]))
+
+    await writer.run(unit)
     return {"ok": True}
+
+def visitor_topic(visitor_id: int) -> str:
+    return f"visitor:{visitor_id}"
+
+def notification_event(n: Notification) -> dict:
+    return NotificationOut.model_validate(n).model_dump(mode="json")
+
+def _sse(event: dict) -> str:
+    return f"id: {event['id']}\nevent: notification\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+async def _event_stream(request: Request, visitor_id: int, last_id: int | None):
+    async with broker.subscribe(visitor_topic(visitor_id)) as sub:
+        yield "retry: 3000\n\n"
+        if last_id is not None:
+            # subscribed first, so nothing committed after this query is missed
+            async with AsyncReadSessionLocal() as db:
+                missed = (await db.scalars(
+                    select(Notification)
+                    .where(Notification.visitor_id == visitor_id, Notification.id > last_id)
+                    .order_by(Notification.id)
+                    .limit(NOTIFY_REPLAY_LIMIT)
+                )).all()
+            for n in missed:
+                last_id = n.id
+                yield _sse(notification_event(n))
+            if len(missed) == NOTIFY_REPLAY_LIMIT:
+                return  # the client reconnects and continues from last_id
+
+        while True:
+            try:
+                event = await sub.get(NOTIFY_HEARTBEAT_SECONDS)
+            except ConnectionResetError:
+                return
+            if event is None:
+                if await request.is_disconnected():
+                    return
+                yield ": ping\n\n"
+                continue
+            if last_id is not None and event["id"] <= last_id:
+                continue
+            last_id = event["id"]
+            yield _sse(event)
+
+@router.get("/stream", summary="Server-sent events for new notifications")
+async def notification_stream(
+    request: Request,
+    last_event_id: int | None = Query(None, description="Resume after this notification id"),
+    me = Depends(get_current_stream),
+):
+    if me["role"] != "visitor":
+        raise HTTPException(403, "Only visitor can subscribe to notifications")
+    header = request.headers.get("last-event-id")
+    if header:
+        try:
+            last_event_id = int(header)
+        except ValueError:
+            raise HTTPException(422, "Invalid Last-Event-ID")
+    return StreamingResponse(
+        _event_stream(request, int(me["sub"]), last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
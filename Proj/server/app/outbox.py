@@ -0,0 +1,148 @@
+import asyncio
+import json
+import logging
+from datetime import datetime, timedelta
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from .database import AsyncReadSessionLocal, AsyncSessionLocal
+from .models import Notification, NotificationOutbox
+from .broker import broker
+from .notifications import visitor_topic, notification_event
+from . import rollups
+from .settings import OUTBOX_BATCH_SIZE, OUTBOX_POLL_SECONDS, OUTBOX_MAX_ATTEMPTS
+
+log = logging.getLogger(__name__)
+
+
+def outbox_row(notification: dict) -> dict:
+    """Outbox insert values for one notification (see ``decision_notification``)."""
+    return {"visitor_id": notification["visitor_id"], "payload": json.dumps(notification, ensure_ascii=False)}
+
+
+async def enqueue(db: AsyncSession, notifications: list[dict]):
+    """Queue notifications in the caller's transaction; call ``outbox.wake()`` after commit."""
+    if notifications:
+        await db.execute(insert(NotificationOutbox), [outbox_row(n) for n in notifications])
+
+
+class OutboxDispatcher:
+    """Drains ``notification_outbox`` into the inbox (``notification`` + unread
+    counters) and then the live broker.
+
+    A row is claimed with a conditional UPDATE in the same transaction that
+    inserts its notification, so a row is delivered exactly once even with
+    several dispatchers (or processes) racing. A failing batch is retried row
+    by row; a failing row backs off exponentially and is left for inspection
+    after ``max_attempts``.
+    """
+
+    def __init__(self, batch_size: int, poll_seconds: float, max_attempts: int):
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.max_attempts = max_attempts
+        self._wake: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+
+    def _due(self, now: datetime):
+        return (
+            NotificationOutbox.dispatched_at.is_(None),
+            NotificationOutbox.available_at <= now,
+            NotificationOutbox.attempts < self.max_attempts,
+        )
+
+    async def dispatch_once(self) -> int:
+        """Deliver one batch of due rows; returns how many rows were attempted."""
+        # candidates come from the read pool; _deliver re-checks them while claiming
+        async with AsyncReadSessionLocal() as db:
+            ids = (await db.scalars(
+                select(NotificationOutbox.id).where(*self._due(datetime.utcnow()))
+                .order_by(NotificationOutbox.available_at, NotificationOutbox.id).limit(self.batch_size)
+            )).all()
+        if not ids:
+            return 0
+        try:
+            await self._deliver(ids)
+        except Exception:
+            for i in ids:
+                try:
+                    await self._deliver([i])
+                except Exception as e:
+                    await self._fail(i, e)
+        return len(ids)
+
+    async def _deliver(self, ids: list[int]):
+        now = datetime.utcnow()
+        async with AsyncSessionLocal() as db:
+            claimed = (await db.execute(
+                update(NotificationOutbox)
+                .where(NotificationOutbox.id.in_(ids), *self._due(now))
+                .values(dispatched_at=now)
+                .returning(NotificationOutbox.payload, NotificationOutbox.created_at)
+                .execution_options(synchronize_session=False)
+            )).all()
+            notifications = []
+            if claimed:
+                values = [{**json.loads(payload), "created_at": created_at} for payload, created_at in claimed]
+                notifications = (await db.scalars(insert(Notification).returning(Notification), values)).all()
+                unread: dict[int, int] = {}
+                for n in notifications:
+                    unread[n.visitor_id] = unread.get(n.visitor_id, 0) + 1
+                for visitor_id, delta in unread.items():
+                    await rollups.track_unread(db, visitor_id, delta)
+            await db.commit()
+        for n in notifications:
+            await broker.publish(visitor_topic(n.visitor_id), notification_event(n))
+
+    async def _fail(self, outbox_id: int, error: Exception):
+        async with AsyncSessionLocal() as db:
+            attempts = await db.scalar(select(NotificationOutbox.attempts).where(NotificationOutbox.id == outbox_id)) or 0
+            await db.execute(
+                update(NotificationOutbox).where(NotificationOutbox.id == outbox_id).values(
+                    attempts=attempts + 1,
+                    available_at=datetime.utcnow() + timedelta(seconds=min(2 ** attempts, 300)),
+                    last_error=f"{type(error).__name__}: {error}"[:500],
+                )
+            )
+            await db.commit()
+
+    async def drain(self):
+        """Dispatch until nothing is due (scripts, tests, shutdown)."""
+        while await self.dispatch_once():
+            pass
+
+    def wake(self):
+        if self._wake is not None:
+            self._wake.set()
+
+    async def _run(self):
+        while True:
+            self._wake.clear()
+            try:
+                attempted = await self.dispatch_once()
+            except Exception:
+                # e.g. the writer is busy; the rows stay due for the next round
+                log.exception("outbox dispatch failed")
+                attempted = 0
+            if attempted < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+
+    def start(self):
+        if self._task is None:
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._wake = None
+
+
+outbox = OutboxDispatcher(OUTBOX_BATCH_SIZE, OUTBOX_POLL_SECONDS, OUTBOX_MAX_ATTEMPTS)
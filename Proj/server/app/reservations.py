@@ -1,16 +1,48 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from itertools import islice
+from pydantic import ValidationError
+from contextlib import ExitStack
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, time, date, timedelta
-from sqlalchemy import case, func,desc
-from .deps import get_db, get_current
-from .models import Reservation, Location, Notification, Visitor
-from .schemas import ReservationCreateIn, ReservationOut
+from sqlalchemy import case, func,desc, or_, and_, select, update
+from fastapi.responses import StreamingResponse
+from .database import DIALECT, AsyncReadSessionLocal
+from .deps import get_async_read_db, get_current
+from .models import Reservation, Location, Visitor
+from .schemas import ReservationCreateIn, ReservationOut, BulkDecisionIn
+from .catalog import location_catalog
+from .booking import BookingIndex
+from .outbox import enqueue, outbox
+from .writer import writer
+from .summary import admin_summary
+from .responses import decode_cursor, encode_cursor, json_rows, rows_as_dicts
+from .transfer import EXPORT_MEDIA_TYPES, csv_chunk, detect_format, iter_rows, ndjson_chunk
+from . import analytics, rollups
+from .settings import DEFAULT_LOCATION_CAPACITY
 
 router = APIRouter()
 
 BUSINESS_START = time(9, 0)   
 BUSINESS_END   = time(17, 0)   
 
+ADMIN_PAGE_SIZE = 100
+BULK_DECISION_LIMIT = 1000
+IMPORT_BATCH_SIZE = 200
+IMPORT_MAX_ERRORS = 1000
+EXPORT_CHUNK_ROWS = 500
+AVAILABILITY_MAX_DAYS = 62
+REPORT_MAX_DAYS = 731
+
+# ReservationOut, in column order
+RESERVATION_OUT_FIELDS = (
+    "id", "start_time", "end_time", "location", "purpose", "status",
+    "visitor_id", "is_driving", "plate_number",
+)
+
+# SQLite serialises every write transaction, so slots are re-read under its lock
+booking_index = BookingIndex(BUSINESS_START, BUSINESS_END, reload=DIALECT == "sqlite")
+
 def normalize_minute(dt: datetime) -> datetime:
     return dt.replace(second=0, microsecond=0)
 
@@ -26,7 +58,7 @@ def assert_business_hours(start: datetime, end: datetime):
     if not (BUSINESS_START < et <= BUSINESS_END):
         raise HTTPException(400, "end_time must be within 09:00–17:00 (exclusive 09:00, inclusive 17:00)")
 
-def resolve_location_id(db: Session, location_id: int | None, campus: str) -> tuple[int, str]:
+def resolve_location_id(location_id: int | None, campus: str) -> tuple[int, str, int]:
     if not location_id:
         raise HTTPException(400, "location_id is required")
 
@@ -34,17 +66,16 @@ def resolve_location_id(db: Session, location_id: int | None, campus: str) -> tu
     if campus not in {"LOWER", "MIDDLE", "UPPER"}:
         raise HTTPException(400, "Invalid campus. Must be LOWER/MIDDLE/UPPER")
 
-    loc = db.get(Location, location_id)
+    loc = location_catalog.get(location_id)
     if not loc or loc.is_active != 1 or (loc.campus or "").upper() != campus:
         raise HTTPException(400, f"Invalid location_id for campus {campus}")
-    return loc.id, loc.name
+    return loc.id, loc.name, loc.capacity or DEFAULT_LOCATION_CAPACITY
 
 
 
 @router.post("/", response_model=ReservationOut, operation_id="reservations_create")
-def create_reservation(
+async def create_reservation(
     data: ReservationCreateIn,
-    db: Session = Depends(get_db),
     me = Depends(get_current),
 ):
     if me["role"] != "visitor":
@@ -57,7 +88,7 @@ def create_reservation(
     assert_business_hours(start, end)
 
     campus_val = data.campus.value if hasattr(data.campus, "value") else data.campus
-    loc_id, loc_name = resolve_location_id(db, data.location_id, campus_val)
+    loc_id, loc_name, capacity = resolve_location_id(data.location_id, campus_val)
 
     r = Reservation(
     visitor_id=int(me["sub"]),
@@ -71,164 +102,491 @@ def create_reservation(
     plate_number=data.plate_number if data.is_driving else None
     )
 
-    db.add(r)
-    db.commit()
-    db.refresh(r)
-    return r
+    async def unit(db: AsyncSession, claims: ExitStack):
+        await booking_index.prepare(db, (loc_id, start.date()))
+        claims.enter_context(booking_index.claim(loc_id, start, end, capacity))
+        db.add(r)
+        await rollups.track_reservation(db, r, 1)
+        await db.flush()
+        return r
+
+    return await writer.run(unit)
+
+def _import_row(row: dict, visitor_id: int) -> tuple[Reservation, int]:
+    data = ReservationCreateIn(**row)
+    start = normalize_minute(data.start_time)
+    end = normalize_minute(data.end_time)
+    assert_business_hours(start, end)
+    campus_val = data.campus.value if hasattr(data.campus, "value") else data.campus
+    loc_id, loc_name, capacity = resolve_location_id(data.location_id, campus_val)
+    return Reservation(
+        visitor_id=visitor_id,
+        start_time=start,
+        end_time=end,
+        location=loc_name,
+        location_id=loc_id,
+        purpose=data.purpose,
+        status="pending",
+        is_driving=1 if data.is_driving else 0,
+        plate_number=data.plate_number if data.is_driving else None,
+    ), capacity
+
+@router.post("/import", summary="Visitor bulk import of reservations (CSV or NDJSON)")
+async def import_reservations(
+    file: UploadFile = File(..., description="CSV with a header row, or one JSON object per line"),
+    format: str | None = Query(None, pattern="^(csv|ndjson)$", description="Overrides detection from the file name"),
+    me = Depends(get_current),
+):
+    if me["role"] != "visitor":
+        raise HTTPException(403, "Only visitor can create")
+    fmt = format or detect_format(file.filename, file.content_type)
+    if not fmt:
+        raise HTTPException(415, "Unsupported file type, upload a .csv or .ndjson file")
+
+    visitor_id = int(me["sub"])
+    imported = failed = 0
+    errors: list[dict] = []
+    batch: list[tuple[int, Reservation, int]] = []
+
+    def fail(line: int, message: str):
+        nonlocal failed
+        failed += 1
+        if len(errors) < IMPORT_MAX_ERRORS:
+            errors.append({"line": line, "error": message})
+
+    async def flush():
+        nonlocal imported
+        rows = list(batch)
+        batch.clear()
+
+        async def unit(db: AsyncSession, claims: ExitStack):
+            await booking_index.prepare(db, *{(r.location_id, r.start_time.date()) for _, r, _ in rows})
+            accepted, rejected = [], []
+            for line, r, capacity in rows:
+                try:
+                    claims.enter_context(booking_index.claim(r.location_id, r.start_time, r.end_time, capacity))
+                except HTTPException as e:
+                    rejected.append((line, e.detail))
+                    continue
+                accepted.append(r)
+            if accepted:
+                db.add_all(accepted)
+                await rollups.track_many(db, [(r.visitor_id, r.location_id, r.start_time) for r in accepted], "pending", 1)
+                await db.flush()
+            return len(accepted), rejected
+
+        accepted, rejected = await writer.run(unit)
+        for line, message in rejected:
+            fail(line, message)
+        imported += accepted
+
+    # reading and decoding the (possibly disk-spooled) upload is blocking: do it off the event loop
+    rows = iter_rows(file.file, fmt)
+    while chunk := await run_in_threadpool(list, islice(rows, IMPORT_BATCH_SIZE)):
+        for line, row in chunk:
+            if isinstance(row, str):
+                fail(line, row)
+                continue
+            try:
+                batch.append((line, *_import_row(row, visitor_id)))
+            except ValidationError as e:
+                fail(line, "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()))
+                continue
+            except HTTPException as e:
+                fail(line, e.detail)
+                continue
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                await flush()
+    if batch:
+        await flush()
+
+    errors.sort(key=lambda e: e["line"])
+    return {"imported": imported, "failed": failed, "errors": errors}
 
 @router.get("/", response_model=list[ReservationOut])
-def list_my_reservations(
+async def list_my_reservations(
     status: str | None = Query(None, pattern="^(pending|approved|denied)$"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     me = Depends(get_current),
 ):
     if me["role"] != "visitor":
         raise HTTPException(403, "Only visitor can list their reservations")
-    q = db.query(Reservation).filter(Reservation.visitor_id == int(me["sub"]))
+    q = select(*(getattr(Reservation, f) for f in RESERVATION_OUT_FIELDS)).where(Reservation.visitor_id == int(me["sub"]))
     if status:
-        q = q.filter(Reservation.status == status)
-    return q.order_by(Reservation.start_time.desc()).all()
+        q = q.where(Reservation.status == status)
+    rows = rows_as_dicts(RESERVATION_OUT_FIELDS, (await db.execute(q.order_by(Reservation.start_time.desc()))).all())
+    for row in rows:
+        row["is_driving"] = bool(row["is_driving"])
+    return json_rows(rows)
+
+@router.get("/availability", summary="Free booking windows for a location or campus")
+async def availability(
+    location_id: int | None = None,
+    campus: str | None = None,
+    date_from: str | None = None,
+    date_to: str | None = None,
+    min_minutes: int = Query(30, ge=1, le=480),
+    me = Depends(get_current),
+):
+    # answered from booking_index alone: no SQL, whatever the range
+    if location_id:
+        loc = location_catalog.get(location_id)
+        if not loc or loc.is_active != 1:
+            raise HTTPException(404, "Location not found")
+        locations = [loc]
+    elif campus:
+        campus = campus.upper()
+        if campus not in {"LOWER", "MIDDLE", "UPPER"}:
+            raise HTTPException(400, "Invalid campus. Must be LOWER/MIDDLE/UPPER")
+        locations = [loc for loc in location_catalog.active() if (loc.campus or "").upper() == campus]
+    else:
+        raise HTTPException(400, "location_id or campus is required")
+
+    now = datetime.now()
+    first = parse_day(date_from) if date_from else now.date()
+    last = parse_day(date_to) if date_to else first
+    if last < first:
+        raise HTTPException(400, "date_to must not be before date_from")
+    if last < now.date():
+        raise HTTPException(400, "Date range is in the past")
+    first = max(first, now.date())
+    if (last - first).days >= AVAILABILITY_MAX_DAYS:
+        raise HTTPException(400, f"Date range must not exceed {AVAILABILITY_MAX_DAYS} days")
+
+    day_start = datetime.combine(first, BUSINESS_START)
+    days = [first + timedelta(days=i) for i in range((last - first).days + 1)]
+    out = []
+    for loc in locations:
+        capacity = loc.capacity or DEFAULT_LOCATION_CAPACITY
+        for day in days:
+            start = day_start + timedelta(days=(day - first).days)
+            # today: nothing before the next whole minute
+            not_before = max(0, -int((start - now).total_seconds() // 60)) if day == now.date() else 0
+            for lo, hi in booking_index.free_windows(loc.id, day, capacity, min_minutes, not_before):
+                out.append({
+                    "location_id": loc.id,
+                    "location": loc.name,
+                    "campus": loc.campus,
+                    "start_time": start + timedelta(minutes=lo),
+                    "end_time": start + timedelta(minutes=hi),
+                })
+    return json_rows(out)
 
 @router.put("/{resv_id}", response_model=ReservationOut, operation_id="reservations_update")
-def update_reservation(
+async def update_reservation(
     resv_id: int,
     data: ReservationCreateIn,  
-    db: Session = Depends(get_db),
     me = Depends(get_current),
 ):
     if me["role"] != "visitor":
         raise HTTPException(403, "Only visitor can update")
 
-    r = db.get(Reservation, resv_id)
-    if not r or r.visitor_id != int(me["sub"]):
-        raise HTTPException(404, "Reservation not found")
-    if r.status != "pending":
-        raise HTTPException(400, "Only pending reservation can be updated")
-
     start = normalize_minute(data.start_time)
     end   = normalize_minute(data.end_time)
 
     assert_business_hours(start, end)
 
     campus_val = data.campus.value if hasattr(data.campus, "value") else data.campus
-    loc_id, loc_name = resolve_location_id(db, data.location_id, campus_val)
-
-    r.start_time  = start
-    r.end_time    = end
-    r.location    = loc_name     
-    r.location_id = loc_id       
-    r.purpose     = data.purpose
-    r.updated_at  = datetime.utcnow()
-    r.is_driving  = 1 if data.is_driving else 0
-    r.plate_number = data.plate_number if data.is_driving else None
-    db.commit()
-    db.refresh(r)
-    return r
+    loc_id, loc_name, capacity = resolve_location_id(data.location_id, campus_val)
+
+    async def unit(db: AsyncSession, claims: ExitStack):
+        r = await db.get(Reservation, resv_id)
+        if not r or r.visitor_id != int(me["sub"]):
+            raise HTTPException(404, "Reservation not found")
+        if r.status != "pending":
+            raise HTTPException(400, "Only pending reservation can be updated")
+
+        previous = (r.location_id, r.start_time, r.end_time) if r.location_id else None
+        if previous:
+            await booking_index.prepare(db, (previous[0], previous[1].date()))
+        await booking_index.prepare(db, (loc_id, start.date()))
+        claims.enter_context(booking_index.claim(loc_id, start, end, capacity, replacing=previous))
+        await rollups.track_reservation(db, r, -1)
+        r.start_time  = start
+        r.end_time    = end
+        r.location    = loc_name     
+        r.location_id = loc_id       
+        r.purpose     = data.purpose
+        r.updated_at  = datetime.utcnow()
+        r.is_driving  = 1 if data.is_driving else 0
+        r.plate_number = data.plate_number if data.is_driving else None
+        await rollups.track_reservation(db, r, 1)
+        return r
+
+    return await writer.run(unit)
 
 @router.delete("/{resv_id}")
-def delete_reservation(
+async def delete_reservation(
     resv_id: int,
-    db: Session = Depends(get_db),
     me = Depends(get_current),
 ):
     if me["role"] != "visitor":
         raise HTTPException(403, "Only visitor can delete")
-    r = db.get(Reservation, resv_id)
-    if not r or r.visitor_id != int(me["sub"]):
-        raise HTTPException(404, "Reservation not found")
-    if r.status != "pending":
-        raise HTTPException(400, "Only pending reservation can be deleted")
-
-    db.delete(r)
-    db.commit()
+
+    async def unit(db: AsyncSession, claims: ExitStack):
+        r = await db.get(Reservation, resv_id)
+        if not r or r.visitor_id != int(me["sub"]):
+            raise HTTPException(404, "Reservation not found")
+        if r.status != "pending":
+            raise HTTPException(400, "Only pending reservation can be deleted")
+        slot = (r.location_id, r.start_time, r.end_time)
+        await rollups.track_reservation(db, r, -1)
+        await db.delete(r)
+        return slot
+
+    booking_index.release(*await writer.run(unit))
     return {"ok": True}
 
 
+def decision_notification(r, decision: str) -> dict:
+    return {
+        "visitor_id": r.visitor_id,
+        "type": "reservation_status",
+        "reservation_id": r.id,
+        "title": "Reservation Approval Result",
+        "body": f"Your reservation on {r.start_time:%Y-%m-%d %H:%M} at {r.location} has been {decision.upper()}.",
+        "is_read": 0,
+    }
+
 @router.put("/{resv_id}/decision")
-def decision(
+async def decision(
     resv_id: int,
     decision: str = Query(..., pattern="^(approved|denied)$"),
-    db: Session = Depends(get_db),
     me = Depends(get_current),
 ):
     if me["role"] != "admin":
         raise HTTPException(403, "Only admin can approve/deny")
 
-    r = db.get(Reservation, resv_id)
-    if not r:
-        raise HTTPException(404, "Reservation not found")
-    if r.status not in ("pending",):
-        raise HTTPException(400, "Only pending reservation can be decided")
-
-
-    r.status = decision
-    r.updated_at = datetime.utcnow()
-
-    title = "Reservation Approval Result"
-    body = f"Your reservation on {r.start_time:%Y-%m-%d %H:%M} at {r.location} has been {decision.upper()}."
-    db.add(Notification(
-        visitor_id=r.visitor_id,
-        type="reservation_status",
-        reservation_id=r.id,
-        title=title,
-        body=body,
-        is_read=0,
-    ))
-
-    db.commit()
+    async def unit(db: AsyncSession, claims: ExitStack):
+        r = await db.get(Reservation, resv_id)
+        if not r:
+            raise HTTPException(404, "Reservation not found")
+        if r.status not in ("pending",):
+            raise HTTPException(400, "Only pending reservation can be decided")
+
+        await rollups.track_reservation(db, r, -1)
+        r.status = decision
+        r.updated_at = datetime.utcnow()
+        await rollups.track_reservation(db, r, 1)
+
+        await enqueue(db, [decision_notification(r, decision)])
+        return r
+
+    r = await writer.run(unit)
+    if decision == "denied":
+        booking_index.release(r.location_id, r.start_time, r.end_time)
+    outbox.wake()
     return {"ok": True, "status": r.status}
-@router.get("/admin/reservations", summary="Admin view all reservations")
-def admin_list_reservations(
-    location_id: int | None = Query(None, description="Filter by location"),
-    date: str | None = Query(None, description="Filter by date (YYYY-MM-DD)"),
-    db: Session = Depends(get_db),
-    me=Depends(get_current)
+
+@router.post("/admin/decisions", summary="Admin approve/deny many pending reservations")
+async def bulk_decision(
+    data: BulkDecisionIn,
+    me = Depends(get_current),
 ):
     if me["role"] != "admin":
-        raise HTTPException(403, "Only admin can view all reservations")
+        raise HTTPException(403, "Only admin can approve/deny")
+    if not data.ids and data.location_id is None and data.day is None:
+        raise HTTPException(422, "Provide ids or a location_id/day filter")
+
+    async def unit(db: AsyncSession, claims: ExitStack):
+        truncated = False
+        if data.ids:
+            ids = list(dict.fromkeys(data.ids))
+        else:
+            q = select(Reservation.id).where(Reservation.status == "pending")
+            if data.location_id is not None:
+                q = q.where(Reservation.location_id == data.location_id)
+            if data.day is not None:
+                day_start = datetime.combine(data.day, time.min)
+                q = q.where(Reservation.start_time >= day_start, Reservation.start_time < day_start + timedelta(days=1))
+            ids = list((await db.scalars(q.order_by(Reservation.start_time, Reservation.id).limit(BULK_DECISION_LIMIT + 1))).all())
+            truncated = len(ids) > BULK_DECISION_LIMIT
+            ids = ids[:BULK_DECISION_LIMIT]
+
+        decided = (await db.execute(
+            update(Reservation)
+            .where(Reservation.id.in_(ids), Reservation.status == "pending")
+            .values(status=data.decision, updated_at=datetime.utcnow())
+            .returning(
+                Reservation.id, Reservation.visitor_id, Reservation.location_id,
+                Reservation.location, Reservation.start_time, Reservation.end_time,
+            )
+            # the batch session may already hold some of these rows (an earlier unit
+            # loaded them): update those copies too so later units see the decision
+            .execution_options(synchronize_session="evaluate")
+        )).all()
+
+        if decided:
+            slots = [(r.visitor_id, r.location_id, r.start_time) for r in decided]
+            await rollups.track_many(db, slots, "pending", -1)
+            await rollups.track_many(db, slots, data.decision, 1)
+            await enqueue(db, [decision_notification(r, data.decision) for r in decided])
+
+        done = {r.id for r in decided}
+        rest = [i for i in ids if i not in done]
+        existing = set((await db.scalars(select(Reservation.id).where(Reservation.id.in_(rest)))).all()) if rest else set()
+        return ids, truncated, decided, done, existing
+
+    ids, truncated, decided, done, existing = await writer.run(unit)
+
+    if data.decision == "denied":
+        for r in decided:
+            booking_index.release(r.location_id, r.start_time, r.end_time)
+    if decided:
+        outbox.wake()
 
-    query = db.query(Reservation).join(Visitor).join(Location)
+    return {
+        "decision": data.decision,
+        "updated": len(decided),
+        "truncated": truncated,
+        "results": [
+            {"id": i, "outcome": data.decision if i in done else "not_pending" if i in existing else "not_found"}
+            for i in ids
+        ],
+    }
+
+ADMIN_LIST_FIELDS = (
+    "id", "visitor_name", "visitor_org", "start_time", "end_time", "campus",
+    "location", "location_id", "purpose", "status", "is_driving", "plate_number",
+)
+
+def parse_day(value: str) -> date:
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise HTTPException(422, "Invalid date format. Must be YYYY-MM-DD")
+
+def admin_list_query(
+    location_id: int | None = None,
+    day: str | None = None,
+    date_from: str | None = None,
+    date_to: str | None = None,
+):
+    query = (
+        select(
+            Reservation.id,
+            Visitor.name,
+            Visitor.org,
+            Reservation.start_time,
+            Reservation.end_time,
+            Location.campus,
+            Location.name,
+            Reservation.location_id,
+            Reservation.purpose,
+            Reservation.status,
+            Reservation.is_driving,
+            Reservation.plate_number,
+        )
+        .join(Visitor, Reservation.visitor_id == Visitor.id)
+        .join(Location, Reservation.location_id == Location.id)
+    )
 
     if location_id is not None:
-        query = query.filter(Reservation.location_id == location_id)
+        query = query.where(Reservation.location_id == location_id)
 
-    if date:
-        try:
-            target_date = datetime.strptime(date, "%Y-%m-%d").date()
-        except ValueError:
-            raise HTTPException(422, "Invalid date format. Must be YYYY-MM-DD")
+    if day:
+        target_date = parse_day(day)
         start_dt = datetime.combine(target_date, datetime.min.time())
         end_dt = datetime.combine(target_date, datetime.max.time())
-        query = query.filter(
+        query = query.where(
             Reservation.start_time >= start_dt,
             Reservation.start_time <= end_dt
         )
+    if date_from:
+        query = query.where(Reservation.start_time >= datetime.combine(parse_day(date_from), time.min))
+    if date_to:
+        query = query.where(Reservation.start_time < datetime.combine(parse_day(date_to) + timedelta(days=1), time.min))
+    return query
+
+def admin_row(row) -> dict:
+    out = dict(zip(ADMIN_LIST_FIELDS, row))
+    out["is_driving"] = bool(out["is_driving"])
+    return out
+
+@router.get("/admin/reservations", summary="Admin view all reservations")
+async def admin_list_reservations(
+    location_id: int | None = Query(None, description="Filter by location"),
+    date: str | None = Query(None, description="Filter by date (YYYY-MM-DD)"),
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
+    limit: int | None = Query(None, ge=1, le=500, description="Page size; enables cursor paging"),
+    db: AsyncSession = Depends(get_async_read_db),
+    me=Depends(get_current)
+):
+    if me["role"] != "admin":
+        raise HTTPException(403, "Only admin can view all reservations")
+
+    query = admin_list_query(location_id, date)
+    query = query.order_by(Reservation.start_time.desc(), Reservation.id.desc())
 
-    results = query.order_by(Reservation.start_time.desc()).all()
-
-    output = []
-    for r in results:
-        output.append({
-            "id": r.id,
-            "visitor_name": r.visitor.name,
-            "visitor_org": r.visitor.org,
-            "start_time": r.start_time,
-            "end_time": r.end_time,
-            "campus": r.location_obj.campus if r.location_obj else None,
-            "location": r.location_obj.name if r.location_obj else None,
-            "purpose": r.purpose,
-            "status": r.status,
-            "is_driving": bool(r.is_driving),
-            "plate_number": r.plate_number,
+    if cursor is None and limit is None:
+        output = [admin_row(r) for r in (await db.execute(query)).all()]
+        return json_rows({
+            "count": len(output),
+            "results": output,
+            "next_cursor": None,
         })
 
-    return {
+    if cursor:
+        after_start, after_id = decode_cursor(cursor)
+        query = query.where(or_(
+            Reservation.start_time < after_start,
+            and_(Reservation.start_time == after_start, Reservation.id < after_id),
+        ))
+    limit = limit or ADMIN_PAGE_SIZE
+    rows = (await db.execute(query.limit(limit + 1))).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    output = [admin_row(r) for r in rows]
+
+    return json_rows({
         "count": len(output),
-        "results": output
-    }
+        "results": output,
+        "next_cursor": encode_cursor(rows[-1][3], rows[-1][0]) if has_more else None,
+    })
+
+async def _export_rows(query, fmt: str):
+    # header goes out before the query runs; rows follow one fetch batch at a time
+    if fmt == "csv":
+        yield csv_chunk([], ADMIN_LIST_FIELDS)
+    async with AsyncReadSessionLocal() as db:
+        result = await db.stream(query.execution_options(yield_per=EXPORT_CHUNK_ROWS))
+        async for rows in result.partitions():
+            rows = [admin_row(r) for r in rows]
+            yield csv_chunk(rows) if fmt == "csv" else ndjson_chunk(rows)
+
+@router.get("/admin/reservations/export", summary="Admin export of reservations (CSV or NDJSON)")
+async def admin_export_reservations(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    location_id: int | None = Query(None, description="Filter by location"),
+    date: str | None = Query(None, description="Filter by date (YYYY-MM-DD)"),
+    date_from: str | None = Query(None, description="First day, inclusive (YYYY-MM-DD)"),
+    date_to: str | None = Query(None, description="Last day, inclusive (YYYY-MM-DD)"),
+    me=Depends(get_current),
+):
+    if me["role"] != "admin":
+        raise HTTPException(403, "Only admin can export reservations")
+
+    query = admin_list_query(location_id, date, date_from, date_to)
+    query = query.order_by(Reservation.start_time, Reservation.id)
+    return StreamingResponse(
+        _export_rows(query, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="reservations.{format}"'},
+    )
+
+@router.get("/admin/summary", summary="Admin dashboard counters")
+async def admin_dashboard_summary(me=Depends(get_current)):
+    if me["role"] != "admin":
+        raise HTTPException(403, "Only admin can view the summary")
+    now = datetime.now()
+    if admin_summary.day != now.date():
+        # first request after midnight, before the background refresh caught up
+        async with AsyncReadSessionLocal() as db:
+            await admin_summary.refresh(db)
+    return admin_summary.snapshot(now)
 
 @router.get("/admin/report/daily", summary="Admin daily reservation report")
-def daily_report(date: str = None, db: Session = Depends(get_db), me=Depends(get_current)):
+async def daily_report(date: str = None, db: AsyncSession = Depends(get_async_read_db), me=Depends(get_current)):
     if me["role"] != "admin":
         raise HTTPException(403, "Only admin can view daily reports")
 
@@ -240,97 +598,65 @@ def daily_report(date: str = None, db: Session = Depends(get_db), me=Depends(get
     else:
         report_date = datetime.today().date()
 
-    day_start = report_date
-    day_end   = report_date + timedelta(days=1)  
-
-    all_count = func.count(Reservation.id).label("reservation_count")
-    approved_sum = func.sum(
-        case((Reservation.status == "approved", 1), else_=0)
-    ).label("approved_count")
+    per_location: dict[int, list[int]] = {}
+    status_counts = {"pending": 0, "approved": 0, "denied": 0}
+    for loc_id, status, count in await rollups.day_rows(db, report_date):
+        status_counts[status] = status_counts.get(status, 0) + count
+        totals = per_location.setdefault(loc_id, [0, 0])
+        totals[0] += count
+        if status == "approved":
+            totals[1] += count
 
-    most_booked = (
-        db.query(
-            Reservation.location_id,
-            Location.name.label("location_name"),
-            all_count,      
-            approved_sum,   
-        )
-        .join(Location, Reservation.location_id == Location.id)
-        .filter(Reservation.start_time >= day_start, Reservation.start_time < day_end)
-        .group_by(Reservation.location_id, Location.name)
-        .order_by(all_count.desc(), approved_sum.desc())   
-        .first()
-    )
+    names = {k: loc.name for k in per_location if (loc := location_catalog.get(k))}
+    per_location = {k: v for k, v in per_location.items() if k in names}
 
+    most_booked = most_visited = None
+    if per_location:
+        loc_id, (total, approved) = max(per_location.items(), key=lambda kv: (kv[1][0], kv[1][1]))
+        most_booked = {"location_name": names[loc_id], "reservation_count": total, "approved_count": approved}
+        loc_id, (total, approved) = max(per_location.items(), key=lambda kv: (kv[1][1], kv[1][0]))
+        most_visited = {"location_name": names[loc_id], "approved_count": approved, "reservation_count": total}
 
-    
-    approved_sum = func.sum(
-        case((Reservation.status == "approved", 1), else_=0)
-    ).label("approved_count")
-    all_count = func.count(Reservation.id).label("reservation_count")
-
-    most_visited = (
-        db.query(
-            Reservation.location_id,
-            Location.name.label("location_name"),
-            approved_sum,  
-            all_count,      
-        )
-        .join(Location, Reservation.location_id == Location.id)
-        .filter(Reservation.start_time >= day_start, Reservation.start_time < day_end)
-        .group_by(Reservation.location_id, Location.name)
-        .order_by(approved_sum.desc(), all_count.desc())   
-        .first()
-    )
-
-    reservation_status_count = (
-        db.query(
-            func.count(Reservation.id).label("total_reservations"),
-            func.sum(case((Reservation.status == "pending", 1), else_=0)).label("pending_count"),
-            func.sum(case((Reservation.status == "approved", 1), else_=0)).label("approved_count"),
-            func.sum(case((Reservation.status == "denied", 1), else_=0)).label("denied_count"),
-        )
-        .filter(Reservation.start_time >= day_start, Reservation.start_time < day_end)
-        .first()
-    )
-
-    day_expr = func.date(Reservation.start_time)  
-    uv_days_subq = (
-        db.query(
-            Reservation.visitor_id.label("vid"),
-            day_expr.label("d"),
-        )
-        .filter(
-            Reservation.start_time < day_end,     
-            Reservation.status == "approved",
-        )
-        .group_by(Reservation.visitor_id, day_expr)
-        .subquery()
-    )
-    total_unique_visitor_days_up_to_date = (
-        db.query(func.count()).select_from(uv_days_subq).scalar() or 0
-    )
+    total_unique_visitor_days_up_to_date = await rollups.visitor_days_up_to(db, report_date)
 
     return {
-        "most_booked_location": {
-            "location_name": most_booked.location_name if most_booked else "No data",
-            "reservation_count": int(most_booked.reservation_count) if most_booked else 0,  
-            "approved_count": int(most_booked.approved_count) if most_booked else 0,
+        "most_booked_location": most_booked or {
+            "location_name": "No data",
+            "reservation_count": 0,
+            "approved_count": 0,
         },
-        "most_visited_location": {
-            "location_name": most_visited.location_name if most_visited else "No data",
-            "approved_count": int(most_visited.approved_count) if most_visited else 0,      
-            "reservation_count": int(most_visited.reservation_count) if most_visited else 0 
+        "most_visited_location": most_visited or {
+            "location_name": "No data",
+            "approved_count": 0,
+            "reservation_count": 0,
         },
         "daily_stats": {
-            "total_reservations": int(reservation_status_count.total_reservations) if reservation_status_count else 0,
-            "pending_count": int(reservation_status_count.pending_count) if reservation_status_count else 0,
-            "approved_count": int(reservation_status_count.approved_count) if reservation_status_count else 0,
-            "denied_count": int(reservation_status_count.denied_count) if reservation_status_count else 0,
+            "total_reservations": sum(status_counts.values()),
+            "pending_count": status_counts["pending"],
+            "approved_count": status_counts["approved"],
+            "denied_count": status_counts["denied"],
             "total_unique_visitor_days_up_to_date": int(total_unique_visitor_days_up_to_date),
         },
         "as_of": str(report_date),
     }
 
-
-
+@router.get("/admin/report/range", summary="Admin reservation report over a date range")
+async def range_report(
+    date_from: str,
+    date_to: str,
+    group_by: str = Query("campus", pattern="^(campus|location)$"),
+    top: int = Query(10, ge=1, le=100, description="Number of top locations"),
+    db: AsyncSession = Depends(get_async_read_db),
+    me=Depends(get_current),
+):
+    if me["role"] != "admin":
+        raise HTTPException(403, "Only admin can view reports")
+    first, last = parse_day(date_from), parse_day(date_to)
+    if last < first:
+        raise HTTPException(400, "date_to must not be before date_from")
+    if (last - first).days >= REPORT_MAX_DAYS:
+        raise HTTPException(400, f"Date range must not exceed {REPORT_MAX_DAYS} days")
+
+    cube, location_ids = await analytics.load_cube(db, first, last)
+    per_day, unique = await analytics.load_visitors(db, first, last)
+    return json_rows(analytics.range_report(cube, location_ids, first, last, per_day, unique, group_by, top))
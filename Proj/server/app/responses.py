@@ -0,0 +1,33 @@
+import base64
+from datetime import datetime
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse, ORJSONResponse
+from .settings import FAST_JSON
+
+# FAST_JSON on: orjson everywhere, and endpoints returning json_rows() skip response_model validation.
+DefaultResponse = ORJSONResponse if FAST_JSON else JSONResponse
+
+
+def json_rows(content):
+    """Return already-shaped rows/dicts; encoded directly by orjson when FAST_JSON is on."""
+    if FAST_JSON:
+        return ORJSONResponse(content)
+    return content
+
+
+def rows_as_dicts(fields: tuple[str, ...], rows) -> list[dict]:
+    return [dict(zip(fields, row)) for row in rows]
+
+
+def encode_cursor(ts: datetime, row_id: int) -> str:
+    """Keyset cursor for lists ordered by (timestamp DESC, id DESC)."""
+    return base64.urlsafe_b64encode(f"{ts.isoformat()}|{row_id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        ts, row_id = raw.split("|")
+        return datetime.fromisoformat(ts), int(row_id)
+    except ValueError:
+        raise HTTPException(422, "Invalid cursor")
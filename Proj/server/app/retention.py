@@ -0,0 +1,48 @@
+from datetime import datetime
+from sqlalchemy import delete, insert, literal, select
+from sqlalchemy.orm import Session
+from .models import Notification, NotificationArchive, NotificationOutbox
+
+# Compaction of the notification tables. Each batch is its own transaction, so
+# the API keeps writing between batches; batches walk ids upwards and never rescan.
+
+ARCHIVE_COLUMNS = ("id", "visitor_id", "type", "reservation_id", "title", "body", "is_read", "created_at")
+
+
+def archive_notifications(db: Session, cutoff: datetime, batch_size: int) -> int:
+    """Move read notifications created before ``cutoff`` into notification_archive."""
+    moved = 0
+    last_id = 0
+    while True:
+        ids = db.scalars(
+            select(Notification.id)
+            .where(Notification.id > last_id, Notification.is_read == 1, Notification.created_at < cutoff)
+            .order_by(Notification.id).limit(batch_size)
+        ).all()
+        if not ids:
+            return moved
+        last_id = ids[-1]
+        # re-check is_read: a row marked unread since the SELECT stays in the inbox
+        batch = (Notification.id.in_(ids), Notification.is_read == 1)
+        now = datetime.utcnow()
+        db.execute(insert(NotificationArchive).from_select(
+            [*ARCHIVE_COLUMNS, "archived_at"],
+            select(*(getattr(Notification, c) for c in ARCHIVE_COLUMNS), literal(now)).where(*batch),
+        ))
+        moved += db.execute(delete(Notification).where(*batch)).rowcount
+        db.commit()
+
+
+def purge_outbox(db: Session, cutoff: datetime, batch_size: int) -> int:
+    """Delete outbox rows dispatched before ``cutoff``."""
+    purged = 0
+    while True:
+        ids = db.scalars(
+            select(NotificationOutbox.id)
+            .where(NotificationOutbox.dispatched_at.is_not(None), NotificationOutbox.dispatched_at < cutoff)
+            .order_by(NotificationOutbox.dispatched_at).limit(batch_size)
+        ).all()
+        if not ids:
+            return purged
+        purged += db.execute(delete(NotificationOutbox).where(NotificationOutbox.id.in_(ids))).rowcount
+        db.commit()
@@ -0,0 +1,175 @@
+from datetime import date, datetime
+from sqlalchemy import Date, func, select, type_coerce, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from .database import DIALECT, day_of
+from .models import Notification, Reservation, ReservationRollup, UnreadCounter, VisitorDay, VisitorDayTotal
+from .summary import admin_summary
+
+# Rollups are written in the caller's transaction; the caller commits.
+
+# INSERT ... ON CONFLICT DO UPDATE, spelled the same on both backends
+insert = postgresql.insert if DIALECT == "postgresql" else sqlite.insert
+
+
+async def _bump(db: AsyncSession, model, keys: dict, column: str, delta: int) -> int:
+    col = getattr(model, column)
+    stmt = (
+        insert(model)
+        .values(**keys, **{column: delta})
+        .on_conflict_do_update(index_elements=list(keys), set_={column: col + delta})
+        .returning(col)
+    )
+    return (await db.execute(stmt)).scalar_one()
+
+
+async def track(db: AsyncSession, visitor_id: int, location_id: int | None, start_time: datetime, status: str | None, delta: int):
+    day = start_time.date()
+    status = status or "pending"
+    await _bump(db, ReservationRollup, {"day": day, "location_id": location_id or 0, "status": status}, "count", delta)
+    if status != "approved":
+        return
+    n = await _bump(db, VisitorDay, {"day": day, "visitor_id": visitor_id}, "approved_count", delta)
+    if (delta > 0 and n == delta) or (delta < 0 and n == 0):
+        await _bump(db, VisitorDayTotal, {"day": day}, "visitors", 1 if delta > 0 else -1)
+
+
+async def track_reservation(db: AsyncSession, r: Reservation, delta: int):
+    await track(db, r.visitor_id, r.location_id, r.start_time, r.status, delta)
+    admin_summary.stage(db, [(r.location_id, r.start_time)], r.status, delta)
+
+
+async def track_many(db: AsyncSession, rows, status: str, delta: int):
+    """``track`` for many (visitor_id, location_id, start_time) rows, one upsert per group."""
+    groups: dict[tuple, list] = {}
+    for visitor_id, location_id, start_time in rows:
+        g = groups.setdefault((visitor_id, location_id, start_time.date()), [start_time, 0])
+        g[1] += delta
+    for (visitor_id, location_id, _), (start_time, total) in groups.items():
+        await track(db, visitor_id, location_id, start_time, status, total)
+    admin_summary.stage(db, [(location_id, start_time) for _, location_id, start_time in rows], status, delta)
+
+
+async def day_rows(db: AsyncSession, day: date) -> list[tuple[int, str, int]]:
+    return (await db.execute(
+        select(ReservationRollup.location_id, ReservationRollup.status, ReservationRollup.count)
+        .where(ReservationRollup.day == day, ReservationRollup.count > 0)
+    )).all()
+
+
+async def visitor_days_up_to(db: AsyncSession, day: date) -> int:
+    return await db.scalar(
+        select(func.sum(VisitorDayTotal.visitors)).where(VisitorDayTotal.day <= day)
+    ) or 0
+
+
+async def track_unread(db: AsyncSession, visitor_id: int, delta: int):
+    if delta:
+        await _bump(db, UnreadCounter, {"visitor_id": visitor_id}, "unread", delta)
+
+
+async def clear_unread(db: AsyncSession, visitor_id: int):
+    await db.execute(update(UnreadCounter).where(UnreadCounter.visitor_id == visitor_id).values(unread=0))
+
+
+async def unread_count(db: AsyncSession, visitor_id: int) -> int:
+    return await db.scalar(
+        select(UnreadCounter.unread).where(UnreadCounter.visitor_id == visitor_id)
+    ) or 0
+
+
+def _rollup_rows():
+    # reservation_rollup as recomputed from reservation: (day, location_id, status, count)
+    day = type_coerce(day_of(Reservation.start_time), Date)
+    status = func.coalesce(Reservation.status, "pending")
+    location_id = func.coalesce(Reservation.location_id, 0)
+    return select(day, location_id, status, func.count()).group_by(day, location_id, status)
+
+
+def backfill(db: Session):
+    db.query(ReservationRollup).delete()
+    db.query(VisitorDay).delete()
+    db.query(VisitorDayTotal).delete()
+
+    day = day_of(Reservation.start_time)
+    db.execute(
+        insert(ReservationRollup).from_select(["day", "location_id", "status", "count"], _rollup_rows())
+    )
+    db.execute(
+        insert(VisitorDay).from_select(
+            ["day", "visitor_id", "approved_count"],
+            select(day, Reservation.visitor_id, func.count())
+            .where(Reservation.status == "approved")
+            .group_by(day, Reservation.visitor_id),
+        )
+    )
+    db.execute(
+        insert(VisitorDayTotal).from_select(
+            ["day", "visitors"],
+            select(VisitorDay.day, func.count()).group_by(VisitorDay.day),
+        )
+    )
+    db.commit()
+
+
+def rollup_drift(db: Session) -> list[tuple[date, int, str, int, int]]:
+    """Compare reservation_rollup with reservation without writing.
+
+    Returns the (day, location_id, status, stored, actual) rows that differ.
+    """
+    actual = {(d, loc, st): n for d, loc, st, n in db.execute(_rollup_rows())}
+    stored = {
+        (d, loc, st): n
+        for d, loc, st, n in db.query(
+            ReservationRollup.day, ReservationRollup.location_id, ReservationRollup.status, ReservationRollup.count
+        ).filter(ReservationRollup.count != 0)
+    }
+    return [
+        (*key, stored.get(key, 0), actual.get(key, 0))
+        for key in sorted(set(actual) | set(stored))
+        if stored.get(key, 0) != actual.get(key, 0)
+    ]
+
+
+def needs_backfill(db: Session) -> bool:
+    return (
+        db.query(ReservationRollup.day).first() is None
+        and db.query(Reservation.id).first() is not None
+    )
+
+
+def reconcile_unread(db: Session, fix: bool = True) -> list[tuple[int, int, int]]:
+    """Recount unread notifications and repair drifted counters (only report them if not ``fix``).
+
+    Returns the (visitor_id, stored, actual) rows that drifted.
+    """
+    actual = dict(
+        db.query(Notification.visitor_id, func.count())
+        .filter(Notification.is_read == 0)
+        .group_by(Notification.visitor_id)
+        .all()
+    )
+    stored = dict(db.query(UnreadCounter.visitor_id, UnreadCounter.unread).all())
+    drift = [
+        (vid, stored.get(vid, 0), actual.get(vid, 0))
+        for vid in sorted(set(actual) | set(stored))
+        if stored.get(vid, 0) != actual.get(vid, 0)
+    ]
+    if not fix:
+        return drift
+    for vid, _, count in drift:
+        db.execute(
+            insert(UnreadCounter)
+            .values(visitor_id=vid, unread=count)
+            .on_conflict_do_update(index_elements=["visitor_id"], set_={"unread": count})
+        )
+    db.commit()
+    return drift
+
+
+def unread_needs_backfill(db: Session) -> bool:
+    return (
+        db.query(UnreadCounter.visitor_id).first() is None
+        and db.query(Notification.id).filter(Notification.is_read == 0).first() is not None
+    )
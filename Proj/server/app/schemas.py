@@ -1,6 +1,6 @@
 from __future__ import annotations
 from typing import Optional
-from datetime import datetime
+from datetime import date, datetime
 from enum import Enum as PyEnum
 import re
 from typing import Annotated
@@ -108,6 +108,12 @@ class ReservationOut(BaseModel):
     class Config:
         from_attributes = True
 
+class BulkDecisionIn(BaseModel):
+    decision: str = Field(..., pattern="^(approved|denied)$")
+    ids: list[int] | None = Field(None, min_length=1, max_length=1000, description="Reservation ids")
+    location_id: int | None = Field(None, description="Filter: pending reservations at this location")
+    day: date | None = Field(None, description="Filter: pending reservations starting on this day")
+
 class NotificationOut(BaseModel):
     id: int
     type: str
@@ -152,17 +158,20 @@ class AdminCreateIn(BaseModel):
 class LocationCreateIn(BaseModel):
     campus: CampusEnum
     name: str
+    capacity: int | None = Field(None, ge=1, description="Max concurrent visits, empty = default")
 
 class LocationUpdateIn(BaseModel):
     campus: Optional[CampusEnum] = None
     name: Optional[str] = None
     is_active: Optional[bool] = None
+    capacity: Optional[int] = Field(None, ge=1)
 
 class LocationAdminOut(BaseModel):
     id: int
     campus: str
     name: str
     is_active: int
+    capacity: int | None = None
 
     class Config:
         from_attributes = True
\ No newline at end of file
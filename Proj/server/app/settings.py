@@ -1,3 +1,88 @@
+import os
+
 JWT_SECRET = "dev-secret"
 JWT_ALGO = "HS256"
-JWT_EXPIRES_MIN = 60 * 24  
\ No newline at end of file
+JWT_EXPIRES_MIN = 60 * 24  
+
+# max concurrent pending/approved reservations per location when location.capacity is NULL
+DEFAULT_LOCATION_CAPACITY = 50
+
+# PRAGMAs run on every new SQLite connection; pick with VMS_SQLITE_PROFILE
+SQLITE_PROFILES = {
+    "default": {},
+    "production": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -64 * 1024,      # KiB
+        "busy_timeout": 5000,          # ms
+        "foreign_keys": "ON",
+    },
+    # seed_data.py: no fsync, no FK checks, large page cache; never for serving
+    "bulk_load": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "cache_size": -512 * 1024,
+        "temp_store": "MEMORY",
+        "threads": 4,                  # sorter helper threads for CREATE INDEX
+        "busy_timeout": 5000,
+        "foreign_keys": "OFF",
+    },
+}
+SQLITE_PROFILE = os.getenv("VMS_SQLITE_PROFILE", "production")
+DB_READ_POOL_SIZE = int(os.getenv("VMS_DB_READ_POOL_SIZE", "8"))
+
+# connection pools for a server database (VMS_DATABASE_URL=postgresql://...); SQLite keeps
+# one writer connection and DB_READ_POOL_SIZE readers and ignores the rest
+DB_POOL_SIZE = int(os.getenv("VMS_DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("VMS_DB_MAX_OVERFLOW", "10"))
+DB_POOL_PRE_PING = os.getenv("VMS_DB_POOL_PRE_PING", "1") == "1"
+DB_POOL_RECYCLE = int(os.getenv("VMS_DB_POOL_RECYCLE", "1800"))               # s, -1 = never
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("VMS_DB_STATEMENT_TIMEOUT_MS", "30000"))  # 0 = none
+
+# pbkdf2_sha256 cost; hashes made with another cost are upgraded on the next login
+PASSWORD_HASH_ROUNDS = int(os.getenv("VMS_PASSWORD_HASH_ROUNDS", "29000"))
+# hashing processes (0 = threadpool) and max queued hash jobs before answering 503
+HASH_WORKERS = int(os.getenv("VMS_HASH_WORKERS", str(os.cpu_count() or 1)))
+HASH_MAX_PENDING = int(os.getenv("VMS_HASH_MAX_PENDING", "64"))
+
+# decoded JWTs keyed by token digest (entries never outlive the token's exp)
+TOKEN_CACHE_SIZE = int(os.getenv("VMS_TOKEN_CACHE_SIZE", "10000"))
+TOKEN_CACHE_TTL = int(os.getenv("VMS_TOKEN_CACHE_TTL", "300"))
+# profile rows behind /auth/me and the profile endpoints; profile writes invalidate them
+PRINCIPAL_CACHE_SIZE = int(os.getenv("VMS_PRINCIPAL_CACHE_SIZE", "10000"))
+PRINCIPAL_CACHE_TTL = int(os.getenv("VMS_PRINCIPAL_CACHE_TTL", "60"))
+
+# notification stream: keep-alive comment interval and max rows replayed per reconnect
+NOTIFY_HEARTBEAT_SECONDS = int(os.getenv("VMS_NOTIFY_HEARTBEAT_SECONDS", "15"))
+NOTIFY_REPLAY_LIMIT = 200
+
+# request/SQL metrics middleware and GET /metrics (Prometheus text format)
+METRICS_ENABLED = os.getenv("VMS_METRICS", "1") == "1"
+
+# orjson as the default response class, and list endpoints that encode rows without pydantic
+FAST_JSON = os.getenv("VMS_FAST_JSON", "1") == "1"
+
+# notification outbox: in-process dispatcher on/off, rows per batch, idle poll, retry budget
+OUTBOX_DISPATCHER = os.getenv("VMS_OUTBOX_DISPATCHER", "1") == "1"
+OUTBOX_BATCH_SIZE = int(os.getenv("VMS_OUTBOX_BATCH_SIZE", "100"))
+OUTBOX_POLL_SECONDS = float(os.getenv("VMS_OUTBOX_POLL_SECONDS", "2"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("VMS_OUTBOX_MAX_ATTEMPTS", "8"))
+
+# admin dashboard counters: recomputed from the rollups this often (and at startup);
+# commits in this process update them immediately
+SUMMARY_REFRESH_SECONDS = float(os.getenv("VMS_SUMMARY_REFRESH_SECONDS", "60"))
+
+# location catalog: re-read this often so location edits made on other workers show up
+CATALOG_REFRESH_SECONDS = float(os.getenv("VMS_CATALOG_REFRESH_SECONDS", "5"))
+
+# archive_notifications.py: read notifications older than this move to notification_archive,
+# dispatched outbox rows are purged after the same age; rows per transaction
+NOTIFY_ARCHIVE_AFTER_DAYS = int(os.getenv("VMS_NOTIFY_ARCHIVE_AFTER_DAYS", "90"))
+NOTIFY_ARCHIVE_BATCH_SIZE = int(os.getenv("VMS_NOTIFY_ARCHIVE_BATCH_SIZE", "1000"))
+
+# group commit: mutations run as units on one writer task, batched over a short window
+# into one transaction (off = each request commits on its own)
+WRITE_COORDINATOR = os.getenv("VMS_WRITE_COORDINATOR", "0") == "1"
+WRITE_BATCH_WINDOW_MS = float(os.getenv("VMS_WRITE_BATCH_WINDOW_MS", "2"))
+WRITE_BATCH_MAX = int(os.getenv("VMS_WRITE_BATCH_MAX", "64"))
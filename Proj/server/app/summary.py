@@ -0,0 +1,135 @@
+import asyncio
+import logging
+from datetime import date, datetime, time, timedelta
+from functools import partial
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from .catalog import location_catalog
+from .database import AsyncReadSessionLocal, after_commit
+from .models import Reservation, ReservationRollup
+from .settings import SUMMARY_REFRESH_SECONDS
+
+log = logging.getLogger(__name__)
+
+STATUSES = ("pending", "approved", "denied")
+UNASSIGNED = "UNASSIGNED"  # reservations without a location_id
+
+
+class AdminSummary:
+    """Process-local counters behind ``GET /reservations/admin/summary``.
+
+    ``load``/``refresh`` recompute them from ``reservation_rollup`` plus today's
+    approved reservations; the background task repeats that every
+    ``refresh_seconds``, which also picks up writes from other processes and
+    rolls ``today`` over at midnight. In between, ``rollups.track_*`` stage a
+    delta for every status change, applied when the writing transaction commits.
+    """
+
+    def __init__(self, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self.day: date | None = None
+        self.refreshed_at: datetime | None = None
+        self._by_campus: dict[tuple[str, str], int] = {}
+        self._today: dict[str, int] = {}
+        self._arrivals = [0] * 24   # approved reservations of ``day`` by start hour
+        self._task: asyncio.Task | None = None
+
+    def _queries(self, day: date):
+        start = datetime.combine(day, time.min)
+        by_location = select(
+            ReservationRollup.location_id,
+            ReservationRollup.status,
+            func.sum(ReservationRollup.count),
+            func.sum(case((ReservationRollup.day == day, ReservationRollup.count), else_=0)),
+        ).group_by(ReservationRollup.location_id, ReservationRollup.status)
+        arrivals = select(Reservation.start_time).where(
+            Reservation.status == "approved",
+            Reservation.start_time >= start,
+            Reservation.start_time < start + timedelta(days=1),
+        )
+        return by_location, arrivals
+
+    def _campus(self, location_id: int | None) -> str:
+        loc = location_catalog.get(location_id) if location_id else None
+        return loc.campus if loc else UNASSIGNED
+
+    def _set(self, day: date, by_location, arrivals):
+        by_campus: dict[tuple[str, str], int] = {}
+        today = dict.fromkeys(STATUSES, 0)
+        for location_id, status, total, on_day in by_location:
+            key = (self._campus(location_id), status)
+            by_campus[key] = by_campus.get(key, 0) + int(total or 0)
+            today[status] = today.get(status, 0) + int(on_day or 0)
+        hours = [0] * 24
+        for (start_time,) in arrivals:
+            hours[start_time.hour] += 1
+        self.day, self._by_campus, self._today, self._arrivals = day, by_campus, today, hours
+        self.refreshed_at = datetime.now()
+
+    def load(self, db: Session):
+        day = date.today()
+        by_location, arrivals = self._queries(day)
+        self._set(day, db.execute(by_location).all(), db.execute(arrivals).all())
+
+    async def refresh(self, db: AsyncSession):
+        day = date.today()
+        by_location, arrivals = self._queries(day)
+        self._set(day, (await db.execute(by_location)).all(), (await db.execute(arrivals)).all())
+
+    def stage(self, db: AsyncSession, slots, status: str | None, delta: int):
+        """Count (location_id, start_time) ``slots`` moving in/out of ``status`` once ``db`` commits."""
+        after_commit(db, partial(self._apply, list(slots), status or "pending", delta))
+
+    def _apply(self, slots, status: str, delta: int):
+        for location_id, start_time in slots:
+            key = (self._campus(location_id), status)
+            self._by_campus[key] = self._by_campus.get(key, 0) + delta
+            if start_time.date() == self.day:
+                self._today[status] = self._today.get(status, 0) + delta
+                if status == "approved":
+                    self._arrivals[start_time.hour] += delta
+
+    def pending(self) -> int:
+        return sum(n for (_, status), n in self._by_campus.items() if status == "pending")
+
+    def snapshot(self, now: datetime) -> dict:
+        by_campus: dict[str, dict[str, int]] = {}
+        for (campus, status), n in sorted(self._by_campus.items()):
+            by_campus.setdefault(campus, dict.fromkeys(STATUSES, 0))[status] = n
+        totals = {s: sum(c[s] for c in by_campus.values()) for s in STATUSES}
+        upcoming = range(now.hour, 24) if now.date() == self.day else range(0)
+        return {
+            "by_campus": by_campus,
+            "totals": totals,
+            "today": {"date": str(self.day), "total": sum(self._today.values()), **self._today},
+            "upcoming_arrivals": [
+                {"hour": f"{h:02d}:00", "approved": self._arrivals[h]} for h in upcoming if self._arrivals[h]
+            ],
+            "refreshed_at": self.refreshed_at.isoformat(timespec="seconds") if self.refreshed_at else None,
+        }
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.refresh_seconds)
+            try:
+                async with AsyncReadSessionLocal() as db:
+                    await self.refresh(db)
+            except Exception:
+                log.exception("admin summary refresh failed")
+
+    def start(self):
+        if self._task is None and self.refresh_seconds > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+admin_summary = AdminSummary(SUMMARY_REFRESH_SECONDS)
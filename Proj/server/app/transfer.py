@@ -0,0 +1,83 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import IO, Iterator
+
+# Row-at-a-time readers/writers for reservation import and export files.
+# Readers yield (line_number, dict) pairs, or (line_number, error message) for unparsable rows.
+
+EXPORT_MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+
+def detect_format(filename: str | None, content_type: str | None) -> str | None:
+    name = (filename or "").lower()
+    ctype = (content_type or "").lower()
+    if name.endswith(".csv") or "csv" in ctype:
+        return "csv"
+    if name.endswith((".ndjson", ".jsonl")) or "ndjson" in ctype or "jsonl" in ctype:
+        return "ndjson"
+    return None
+
+
+def iter_csv(raw: IO[bytes]) -> Iterator[tuple[int, dict | str]]:
+    text = io.TextIOWrapper(raw, encoding="utf-8-sig", newline="")
+    reader = csv.DictReader(text)
+    try:
+        for row in reader:
+            if None in row:
+                yield reader.line_num, "Too many columns"
+                continue
+            yield reader.line_num, {k.strip(): v.strip() for k, v in row.items() if k and v is not None and v.strip()}
+    except (csv.Error, UnicodeDecodeError) as e:
+        yield reader.line_num, f"Unreadable CSV: {e}"
+    finally:
+        text.detach()
+
+
+def iter_ndjson(raw: IO[bytes]) -> Iterator[tuple[int, dict | str]]:
+    for line_num, line in enumerate(raw, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except (ValueError, UnicodeDecodeError) as e:
+            yield line_num, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(row, dict):
+            yield line_num, "Each line must be a JSON object"
+            continue
+        yield line_num, {k: v for k, v in row.items() if v is not None and v != ""}
+
+
+def iter_rows(raw: IO[bytes], fmt: str) -> Iterator[tuple[int, dict | str]]:
+    return iter_csv(raw) if fmt == "csv" else iter_ndjson(raw)
+
+
+def _plain(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _csv_cell(value):
+    # 1/0 rather than str(bool): what the importer (and most CSV tools) read back
+    if isinstance(value, bool):
+        return int(value)
+    return _plain(value)
+
+
+def csv_chunk(rows: list[dict], fields: tuple[str, ...] | None = None) -> str:
+    """Rows as CSV text, preceded by a header row when ``fields`` is given."""
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    if fields is not None:
+        writer.writerow(fields)
+    for row in rows:
+        writer.writerow([_csv_cell(v) for v in row.values()])
+    return buf.getvalue()
+
+
+def ndjson_chunk(rows: list[dict]) -> str:
+    return "".join(json.dumps(row, default=_plain, ensure_ascii=False) + "\n" for row in rows)
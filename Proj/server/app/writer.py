@@ -0,0 +1,125 @@
+import asyncio
+from contextlib import ExitStack
+from typing import Awaitable, Callable
+from sqlalchemy.ext.asyncio import AsyncSession
+from .database import AsyncSessionLocal
+from .settings import WRITE_COORDINATOR, WRITE_BATCH_WINDOW_MS, WRITE_BATCH_MAX
+
+# A unit of work: does its reads and writes on ``db`` without committing, enters
+# anything that must be undone on failure (booking claims) on ``claims``, and
+# returns the endpoint's result. Post-commit effects stay with the caller.
+Unit = Callable[[AsyncSession, ExitStack], Awaitable]
+
+
+class WriteCoordinator:
+    """Runs mutations as units of work.
+
+    Disabled (the default), ``run`` is a plain per-request transaction. Enabled,
+    units queue for a single writer task that takes every unit arriving within
+    ``window`` (up to ``max_batch``), runs each inside its own SAVEPOINT and
+    commits the batch once. A unit that raises is rolled back to its savepoint
+    and gets its exception; the rest of the batch still commits. If the commit
+    itself fails, every unit in the batch fails with that error. Batches run on
+    the same single write connection as every other API write (see database.py),
+    so within a process nothing writes beside them.
+    """
+
+    def __init__(self, enabled: bool, window_ms: float, max_batch: int):
+        self.enabled = enabled
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.batches = 0
+        self.units = 0
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+
+    async def run(self, unit: Unit):
+        if self._task is None:
+            async with AsyncSessionLocal() as db:
+                with ExitStack() as claims:
+                    result = await unit(db, claims)
+                    await db.commit()
+                return result
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((unit, future))
+        return await future
+
+    async def _collect(self) -> tuple[list, bool]:
+        """Next batch, and whether ``stop`` was requested (a None in the queue)."""
+        first = await self._queue.get()
+        if first is None:
+            return [], True
+        batch = [first]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.window
+        while len(batch) < self.max_batch:
+            if not self._queue.empty():
+                item = self._queue.get_nowait()
+            else:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    async def _commit(self, batch: list):
+        done = []
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.begin()
+                staged = db.info.setdefault("after_commit", [])
+                for unit, future in batch:
+                    claims = ExitStack()
+                    mark = len(staged)
+                    try:
+                        async with db.begin_nested():
+                            result = await unit(db, claims)
+                    except Exception as e:
+                        del staged[mark:]
+                        claims.__exit__(type(e), e, e.__traceback__)
+                        if not future.done():
+                            future.set_exception(e)
+                        continue
+                    done.append((future, result, claims))
+                await db.commit()
+        except Exception as e:
+            for _, _, claims in done:
+                claims.__exit__(type(e), e, e.__traceback__)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        self.batches += 1
+        self.units += len(batch)
+        for future, result, claims in done:
+            claims.close()
+            if not future.done():
+                future.set_result(result)
+
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            batch, stopping = await self._collect()
+            if batch:
+                await self._commit(batch)
+
+    def start(self):
+        if self.enabled and self._task is None:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Commit what is already queued, then fall back to per-request transactions."""
+        task, self._task = self._task, None
+        if task is not None:
+            await self._queue.put(None)
+            await task
+
+
+writer = WriteCoordinator(WRITE_COORDINATOR, WRITE_BATCH_WINDOW_MS, WRITE_BATCH_MAX)
@@ -0,0 +1,29 @@
+import argparse
+from datetime import datetime, timedelta
+
+from app.database import SessionLocal
+from app.retention import archive_notifications, purge_outbox
+from app.settings import NOTIFY_ARCHIVE_AFTER_DAYS, NOTIFY_ARCHIVE_BATCH_SIZE
+
+# Notification retention: moves read notifications older than --days into
+# notification_archive and purges delivered outbox rows, in bounded batches.
+# Safe to run while the API is up; schedule it (e.g. nightly cron).
+# Run from the server directory: python archive_notifications.py [--days N]
+
+def main():
+    parser = argparse.ArgumentParser(description="archive old read notifications")
+    parser.add_argument("--days", type=int, default=NOTIFY_ARCHIVE_AFTER_DAYS)
+    parser.add_argument("--batch-size", type=int, default=NOTIFY_ARCHIVE_BATCH_SIZE)
+    args = parser.parse_args()
+
+    cutoff = datetime.utcnow() - timedelta(days=args.days)
+    db = SessionLocal()
+    try:
+        moved = archive_notifications(db, cutoff, args.batch_size)
+        purged = purge_outbox(db, cutoff, args.batch_size)
+        print(f"✅ Archived {moved} read notification(s) and purged {purged} outbox row(s) older than {cutoff:%Y-%m-%d}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+import argparse
+import os
+
+# Rebuild the daily report rollups from the reservation table.
+# Run from the server directory: python backfill_rollups.py [--db PATH] [--dry-run]
+
+def main():
+    parser = argparse.ArgumentParser(description="rebuild the daily report rollups from reservation")
+    parser.add_argument("--db", help="SQLite database to rebuild (default: VMS_DB_PATH or ../vms.db)")
+    parser.add_argument("--dry-run", action="store_true", help="report rollup rows that disagree with reservation; write nothing")
+    args = parser.parse_args()
+    if args.db:
+        if os.getenv("VMS_DATABASE_URL"):
+            parser.error("--db is a SQLite path; unset VMS_DATABASE_URL to use it")
+        if not os.path.exists(args.db):
+            parser.error(f"no such database: {args.db}")
+        os.environ["VMS_DB_PATH"] = os.path.abspath(args.db)
+
+    from app.database import SessionLocal, engine
+    from app.models import ReservationRollup, VisitorDayTotal
+    from app import rollups
+
+    db = SessionLocal()
+    try:
+        if args.dry_run:
+            drift = rollups.rollup_drift(db)
+            for day, location_id, status, stored, actual in drift[:50]:
+                print(f"{day} location {location_id} {status}: {stored} -> {actual}")
+            print(f"{len(drift)} rollup row(s) out of date in {engine.url.render_as_string()} (dry run, nothing written)")
+            return
+        rollups.backfill(db)
+        rows = db.query(ReservationRollup).count()
+        days = db.query(VisitorDayTotal).count()
+        print(f"✅ Rollups rebuilt: {rows} (day, location, status) rows, {days} visitor days")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+
+import orjson
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.models import Notification, Reservation, Visitor
+from app.notifications import NOTIFICATION_OUT_FIELDS
+from app.reservations import RESERVATION_OUT_FIELDS
+from app.responses import rows_as_dicts
+from app.schemas import NotificationOut, ReservationOut
+
+# Per-row cost of the list endpoints' response path: ORM entity + response_model
+# validation + stdlib json (old) vs column tuples + dicts + orjson (FAST_JSON).
+# Uses an in-memory database; run from the server directory: python bench_serialization.py
+
+
+def seed(engine, rows: int):
+    Base.metadata.create_all(engine)
+    start = datetime(2030, 1, 1, 9)
+    with Session(engine) as db:
+        db.add(Visitor(id=1, name="Bench", phone="10000000000", email="bench@example.com", password_hash="x"))
+        db.flush()
+        db.execute(insert(Reservation), [{
+            "visitor_id": 1, "start_time": start + timedelta(hours=i), "end_time": start + timedelta(hours=i, minutes=45),
+            "location": "Teaching Building A", "location_id": 1, "purpose": "benchmark row", "status": "pending",
+            "is_driving": i % 2, "plate_number": "AB1234" if i % 2 else None,
+        } for i in range(rows)])
+        db.execute(insert(Notification), [{
+            "visitor_id": 1, "type": "reservation_status", "reservation_id": None, "title": "Reservation Approval Result",
+            "body": f"Your reservation #{i} has been APPROVED.", "is_read": i % 2,
+        } for i in range(rows)])
+        db.commit()
+
+
+def old_path(db: Session, model, schema):
+    objs = db.scalars(select(model)).all()
+    adapter = TypeAdapter(list[schema])
+    data = adapter.dump_python(adapter.validate_python(objs, from_attributes=True), mode="json")
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def fast_path(db: Session, model, fields):
+    rows = rows_as_dicts(fields, db.execute(select(*(getattr(model, f) for f in fields))).all())
+    if "is_driving" in fields:
+        for row in rows:
+            row["is_driving"] = bool(row["is_driving"])
+    return orjson.dumps(rows)
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="list endpoint serialization benchmark")
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    seed(engine, args.rows)
+    cases = [
+        ("GET /reservations/", Reservation, ReservationOut, RESERVATION_OUT_FIELDS),
+        ("GET /notifications/", Notification, NotificationOut, NOTIFICATION_OUT_FIELDS),
+    ]
+    print(f"{args.rows} rows, best of {args.repeat}")
+    print(f"{'endpoint':22} {'old µs/row':>11} {'fast µs/row':>12} {'speedup':>8}")
+    with Session(engine) as db:
+        for name, model, schema, fields in cases:
+            assert json.loads(old_path(db, model, schema)) == json.loads(fast_path(db, model, fields))
+            old = best_of(lambda: (old_path(db, model, schema), db.expunge_all()), args.repeat)
+            fast = best_of(lambda: fast_path(db, model, fields), args.repeat)
+            print(f"{name:22} {old / args.rows * 1e6:11.2f} {fast / args.rows * 1e6:12.2f} {old / fast:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
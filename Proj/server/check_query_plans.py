@@ -0,0 +1,198 @@
+import argparse
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+from datetime import datetime
+
+from sqlalchemy import event
+
+# Runs every API endpoint once against a copy of the database, captures the SQL
+# each one emits (before_cursor_execute) and checks EXPLAIN QUERY PLAN for full
+# table scans. Exits 1 when a hot query scans a table that is not allowed to be scanned.
+# Run from the server directory: python check_query_plans.py [--db path] [--verbose]
+
+# tables small enough (or read once per process) that a SCAN is fine
+SCAN_OK_TABLES = {"location", "admin"}
+
+# (endpoint label, table) -> reason, for scans that are accepted on purpose
+ALLOWED_SCANS: dict[tuple[str, str], str] = {
+    ("admin summary refresh", "reservation_rollup"):
+        "background aggregate, one row per (day, location, status), not per request",
+}
+
+
+def endpoints(ids: dict) -> list[tuple]:
+    """(label, role, method, url, kwargs) in execution order."""
+    day = "2031-07-01"
+    booking = {"campus": "LOWER", "location_id": ids["location"], "purpose": "plan check",
+               "start_time": f"{day}T10:00:00", "end_time": f"{day}T11:00:00"}
+    moved = {**booking, "start_time": f"{day}T12:00:00", "end_time": f"{day}T13:00:00"}
+    csv = ("start_time,end_time,campus,location_id\n"
+           f"{day}T14:00:00,{day}T15:00:00,LOWER,{ids['location']}\n").encode()
+    return [
+        ("POST /auth/visitor/login", None, "POST", "/auth/visitor/login",
+         {"json": {"identifier": "13823573801", "password": "Pwd@123456"}}),
+        ("POST /auth/visitor/login (email)", None, "POST", "/auth/visitor/login",
+         {"json": {"identifier": "123090001@gmail.com", "password": "Pwd@123456"}}),
+        ("POST /auth/visitor/register", None, "POST", "/auth/visitor/register",
+         {"json": {"name": "Plan Check", "phone": "19900000000", "email": "plan@check.dev", "password": "Pwd@123456"}}),
+        ("POST /auth/admin/login", None, "POST", "/auth/admin/login",
+         {"json": {"username": "Admin1", "password": "Pwd@123456"}}),
+        ("GET /auth/me", "visitor", "GET", "/auth/me", {}),
+        ("GET /auth/visitor/profile", "visitor", "GET", "/auth/visitor/profile", {}),
+        ("PUT /auth/visitor/profile", "visitor", "PUT", "/auth/visitor/profile",
+         {"json": {"email": "123090001@gmail.com", "phone": "13823573801"}}),
+        ("GET /auth/admin/profile", "admin", "GET", "/auth/admin/profile", {}),
+        ("GET /locations/flat", None, "GET", "/locations/flat", {}),
+        ("POST /reservations/", "visitor", "POST", "/reservations/", {"json": booking}),
+        ("PUT /reservations/{id}", "visitor", "PUT", "/reservations/{rid}", {"json": moved}),
+        ("GET /reservations/", "visitor", "GET", "/reservations/", {}),
+        ("GET /reservations/?status", "visitor", "GET", "/reservations/?status=pending", {}),
+        ("POST /reservations/import", "visitor", "POST", "/reservations/import",
+         {"files": {"file": ("plan.csv", csv, "text/csv")}}),
+        ("PUT /reservations/{id}/decision", "admin", "PUT", "/reservations/{rid}/decision?decision=approved", {}),
+        ("POST /reservations/admin/decisions (filter)", "admin", "POST", "/reservations/admin/decisions",
+         {"json": {"decision": "denied", "location_id": ids["location"], "day": day}}),
+        ("GET /reservations/admin/reservations (unfiltered)", "admin", "GET", "/reservations/admin/reservations?limit=100", {}),
+        ("GET /reservations/admin/reservations?date", "admin", "GET", f"/reservations/admin/reservations?date={day}&limit=100", {}),
+        ("GET /reservations/admin/reservations?location_id", "admin", "GET",
+         f"/reservations/admin/reservations?location_id={ids['location']}&limit=100", {}),
+        ("GET /reservations/admin/reservations/export?range", "admin", "GET",
+         f"/reservations/admin/reservations/export?date_from={day}&date_to={day}", {}),
+        ("GET /reservations/admin/summary", "admin", "GET", "/reservations/admin/summary", {}),
+        ("GET /reservations/admin/report/daily", "admin", "GET", f"/reservations/admin/report/daily?date={day}", {}),
+        ("GET /reservations/admin/report/range", "admin", "GET",
+         f"/reservations/admin/report/range?date_from=2031-06-01&date_to={day}&group_by=location", {}),
+        ("GET /notifications/", "visitor", "GET", "/notifications/notifications/?limit=10", {}),
+        ("GET /notifications/?cursor", "visitor", "GET", "/notifications/notifications/?limit=10&cursor={ncursor}", {}),
+        ("GET /notifications/?unread_only", "visitor", "GET", "/notifications/notifications/?unread_only=true", {}),
+        ("GET /notifications/unread_count", "visitor", "GET", "/notifications/notifications/unread_count", {}),
+        ("PATCH /notifications/{id}/read", "visitor", "PATCH", "/notifications/notifications/{nid}/read", {"json": {"is_read": True}}),
+        ("POST /notifications/read_all", "visitor", "POST", "/notifications/notifications/read_all", {}),
+        ("DELETE /reservations/{id}", "visitor", "DELETE", "/reservations/{rid2}", {}),
+    ]
+
+
+class Capture:
+    def __init__(self):
+        self.label: str | None = None
+        self.statements: dict[str, list[tuple[str, tuple]]] = {}
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if self.label is None:
+            return
+        if executemany:
+            parameters = parameters[0] if parameters else ()
+        self.statements.setdefault(self.label, []).append((statement, tuple(parameters or ())))
+
+
+def full_scans(plan: list[tuple]) -> list[str]:
+    # SQLite >= 3.36 reports "SCAN t" for a table scan and "SCAN t USING [COVERING] INDEX i" for an index walk
+    return [row[3] for row in plan if row[3].startswith("SCAN ") and " USING " not in row[3]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EXPLAIN QUERY PLAN regression check")
+    parser.add_argument("--db", help="database to copy and check against (default ../vms.db)")
+    parser.add_argument("--verbose", action="store_true", help="print every plan")
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix="vms-plan-")
+    src = args.db or os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "vms.db")
+    db_path = shutil.copy(src, os.path.join(tmpdir, "vms.db"))
+    os.environ["VMS_DB_PATH"] = db_path
+    os.environ.setdefault("VMS_HASH_WORKERS", "0")
+    # the outbox is drained explicitly below so its statements get their own label
+    os.environ["VMS_OUTBOX_DISPATCHER"] = "0"
+
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.database import engine, async_engine, async_read_engine
+    from app.outbox import outbox
+    from app.summary import admin_summary
+    from app.database import AsyncReadSessionLocal
+    from app.responses import encode_cursor
+
+    capture = Capture()
+    for e in (engine, async_engine.sync_engine, async_read_engine.sync_engine):
+        event.listen(e, "before_cursor_execute", capture)
+
+    async def refresh_summary():
+        async with AsyncReadSessionLocal() as db:
+            await admin_summary.refresh(db)
+
+    failures = []
+    with TestClient(app) as client:
+        tokens = {
+            "visitor": client.post("/auth/visitor/login", json={"identifier": "13823573801", "password": "Pwd@123456"}).json()["access_token"],
+            "admin": client.post("/auth/admin/login", json={"username": "Admin1", "password": "Pwd@123456"}).json()["access_token"],
+        }
+        loc = client.get("/locations/flat").json()[0]
+        ids = {"location": loc["id"], "ncursor": encode_cursor(datetime(2100, 1, 1), 2 ** 31)}
+        for label, role, method, url, kwargs in endpoints(ids):
+            headers = {"Authorization": f"Bearer {tokens[role]}"} if role else {}
+            url = url.format(**ids)
+            capture.label = label
+            r = client.request(method, url, headers=headers, **kwargs)
+            capture.label = None
+            if r.status_code >= 400:
+                failures.append(f"{label}: HTTP {r.status_code} {r.text[:200]}")
+            if label == "POST /reservations/":
+                ids["rid"] = r.json()["id"]
+                extra = {**kwargs["json"], "start_time": "2031-07-02T10:00:00", "end_time": "2031-07-02T11:00:00"}
+                ids["rid2"] = client.post("/reservations/", json=extra, headers=headers).json()["id"]
+            if label == "PUT /reservations/{id}/decision":
+                capture.label = "outbox dispatch"
+                client.portal.call(outbox.drain)
+                capture.label = "admin summary refresh"
+                client.portal.call(refresh_summary)
+                capture.label = None
+                ids["nid"] = client.get("/notifications/notifications/?limit=1", headers={
+                    "Authorization": f"Bearer {tokens['visitor']}"}).json()[0]["id"]
+
+    con = sqlite3.connect(db_path)
+    indexes = {name for name, table in con.execute(
+        "SELECT name, tbl_name FROM sqlite_master WHERE type = 'index' AND name NOT LIKE 'sqlite_autoindex_%'")
+        if table not in SCAN_OK_TABLES}
+    used = set()
+    checked = 0
+    for label, statements in capture.statements.items():
+        for statement, params in statements:
+            verb = statement.lstrip().split(None, 1)[0].upper()
+            if verb not in ("SELECT", "UPDATE", "DELETE", "INSERT", "WITH"):
+                continue
+            try:
+                plan = con.execute("EXPLAIN QUERY PLAN " + statement, params).fetchall()
+            except sqlite3.Error as e:
+                failures.append(f"{label}: cannot explain ({e}): {statement}")
+                continue
+            checked += 1
+            used.update(word for row in plan for word in row[3].split() if word in indexes)
+            if args.verbose:
+                print(f"-- {label}\n{' '.join(statement.split())}")
+                for row in plan:
+                    print("   ", row[3])
+            for detail in full_scans(plan):
+                table = detail.split()[1]
+                if table in SCAN_OK_TABLES or (label, table) in ALLOWED_SCANS:
+                    continue
+                failures.append(f"{label}: {detail}\n    {' '.join(statement.split())}")
+    con.close()
+    shutil.rmtree(tmpdir, ignore_errors=True)
+
+    print(f"checked {checked} statements from {len(capture.statements)} endpoints")
+    unused = sorted(indexes - used)
+    if unused:
+        print("indexes no endpoint used:", ", ".join(unused))
+    if failures:
+        print("❌ Query plan regressions:")
+        for f in failures:
+            print(" -", f)
+        sys.exit(1)
+    print("✅ No full table scans on hot queries")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+import argparse
+import asyncio
+
+from app.database import async_engine
+from app.outbox import outbox
+
+# Standalone notification outbox dispatcher, for deployments that run the API
+# with VMS_OUTBOX_DISPATCHER=0 (e.g. several uvicorn workers and one dispatcher).
+# Run from the server directory: python dispatch_outbox.py [--once]
+
+
+async def run(once: bool):
+    try:
+        if once:
+            await outbox.drain()
+        else:
+            outbox.start()
+            await asyncio.Event().wait()
+    finally:
+        await outbox.stop()
+        await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="notification outbox dispatcher")
+    parser.add_argument("--once", action="store_true", help="deliver everything due, then exit")
+    args = parser.parse_args()
+    try:
+        asyncio.run(run(args.once))
+    except KeyboardInterrupt:
+        pass
+    if args.once:
+        print("✅ Outbox drained")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import deque
+from datetime import datetime, timedelta
+
+import httpx
+
+# Load generator with per-route latency percentiles.
+# Run from the server directory:
+#   python loadtest.py                                    # in-process (ASGI) against a temp copy of vms.db
+#   python loadtest.py --url http://127.0.0.1:8000        # against a running uvicorn
+#   python loadtest.py --out after.json --baseline before.json
+
+VISITORS = [("13823573801", "Pwd@123456"), ("13823573802", "Pwd@123456"),
+            ("13823573803", "Pwd@123456"), ("13823573804", "Pwd@123456")]
+ADMINS = [("Admin1", "Pwd@123456"), ("Admin2", "Pwd@123456"),
+          ("Admin3", "Pwd@123456"), ("Admin4", "Pwd@123456")]
+
+# scenario -> weight
+MIXES = {
+    "default": {"login": 1, "booking": 3, "poll": 8, "admin_list": 2, "decision": 2},
+    "login-storm": {"login": 1},
+    "visitor": {"booking": 1, "poll": 3},
+    "admin": {"admin_list": 2, "decision": 1},
+}
+
+
+class Recorder:
+    def __init__(self):
+        self.samples: dict[str, list[float]] = {}
+        self.statuses: dict[str, dict[str, int]] = {}
+
+    def add(self, route: str, seconds: float, status: str):
+        self.samples.setdefault(route, []).append(seconds)
+        counts = self.statuses.setdefault(route, {})
+        counts[status] = counts.get(status, 0) + 1
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    # nearest rank
+    return sorted_values[max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)]
+
+
+class Runner:
+    def __init__(self, client: httpx.AsyncClient, rec: Recorder, seed: int):
+        self.client = client
+        self.rec = rec
+        self.seed = seed
+        self.visitor_tokens: list[str] = []
+        self.admin_tokens: list[str] = []
+        self.locations: list[dict] = []
+        self.pending: deque[int] = deque(maxlen=10000)
+
+    async def call(self, method: str, route: str, url: str, token: str | None = None, **kw) -> httpx.Response | None:
+        headers = {"Authorization": f"Bearer {token}"} if token else None
+        t0 = time.perf_counter()
+        try:
+            r = await self.client.request(method, url, headers=headers, **kw)
+        except httpx.HTTPError as e:
+            self.rec.add(route, time.perf_counter() - t0, type(e).__name__)
+            return None
+        self.rec.add(route, time.perf_counter() - t0, str(r.status_code))
+        return r
+
+    async def setup(self):
+        for phone, pwd in VISITORS:
+            r = await self.client.post("/auth/visitor/login", json={"identifier": phone, "password": pwd})
+            r.raise_for_status()
+            self.visitor_tokens.append(r.json()["access_token"])
+        for username, pwd in ADMINS:
+            r = await self.client.post("/auth/admin/login", json={"username": username, "password": pwd})
+            if r.status_code == 200:
+                self.admin_tokens.append(r.json()["access_token"])
+        r = await self.client.get("/locations/flat")
+        r.raise_for_status()
+        self.locations = r.json()
+        if not self.admin_tokens or not self.locations:
+            raise SystemExit("seed data missing: need admins and active locations")
+
+    # --- scenarios -------------------------------------------------------
+
+    async def login(self, rnd: random.Random):
+        phone, pwd = rnd.choice(VISITORS)
+        await self.call("POST", "POST /auth/visitor/login", "/auth/visitor/login",
+                        json={"identifier": phone, "password": pwd})
+
+    async def booking(self, rnd: random.Random):
+        token = rnd.choice(self.visitor_tokens)
+        loc = rnd.choice(self.locations)
+        day = datetime.now().date() + timedelta(days=rnd.randint(1, 60))
+        start = datetime.combine(day, datetime.min.time()) + timedelta(hours=9, minutes=15 * rnd.randint(0, 27))
+        body = {"campus": loc["campus"], "location_id": loc["id"],
+                "start_time": start.isoformat(), "end_time": (start + timedelta(minutes=60)).isoformat(),
+                "purpose": "load test"}
+        r = await self.call("POST", "POST /reservations/", "/reservations/", token, json=body)
+        if r is None or r.status_code != 200:
+            return
+        rid = r.json()["id"]
+        body["start_time"] = (start + timedelta(minutes=15)).isoformat()
+        body["end_time"] = (start + timedelta(minutes=60)).isoformat()
+        await self.call("PUT", "PUT /reservations/{id}", f"/reservations/{rid}", token, json=body)
+        self.pending.append(rid)
+
+    async def poll(self, rnd: random.Random):
+        token = rnd.choice(self.visitor_tokens)
+        await self.call("GET", "GET /notifications/unread_count", "/notifications/notifications/unread_count", token)
+        if rnd.random() < 0.25:
+            await self.call("GET", "GET /notifications/", "/notifications/notifications/?limit=10", token)
+        if rnd.random() < 0.25:
+            await self.call("GET", "GET /reservations/", "/reservations/", token)
+
+    async def admin_list(self, rnd: random.Random):
+        token = rnd.choice(self.admin_tokens)
+        r = await self.call("GET", "GET /reservations/admin/reservations", "/reservations/admin/reservations?limit=100", token)
+        if r is not None and r.status_code == 200 and rnd.random() < 0.3 and r.json().get("next_cursor"):
+            await self.call("GET", "GET /reservations/admin/reservations", "/reservations/admin/reservations",
+                            token, params={"limit": 100, "cursor": r.json()["next_cursor"]})
+
+    async def decision(self, rnd: random.Random):
+        if not self.pending:
+            return await self.admin_list(rnd)
+        rid = self.pending.popleft()
+        decision = "approved" if rnd.random() < 0.7 else "denied"
+        await self.call("PUT", "PUT /reservations/{id}/decision", f"/reservations/{rid}/decision",
+                        rnd.choice(self.admin_tokens), params={"decision": decision})
+
+    async def worker(self, index: int, mix: dict[str, int], deadline: float):
+        rnd = random.Random(self.seed * 1000 + index)
+        names, weights = list(mix), list(mix.values())
+        while time.perf_counter() < deadline:
+            await getattr(self, rnd.choices(names, weights)[0])(rnd)
+
+
+def summarize(rec: Recorder, elapsed: float) -> dict:
+    routes = {}
+    total = 0
+    for route in sorted(rec.samples):
+        values = sorted(rec.samples[route])
+        total += len(values)
+        routes[route] = {
+            "count": len(values),
+            "rps": round(len(values) / elapsed, 2),
+            "mean_ms": round(sum(values) / len(values) * 1000, 2),
+            "p50_ms": round(percentile(values, 50) * 1000, 2),
+            "p95_ms": round(percentile(values, 95) * 1000, 2),
+            "p99_ms": round(percentile(values, 99) * 1000, 2),
+            "max_ms": round(values[-1] * 1000, 2),
+            "statuses": rec.statuses[route],
+        }
+    return {"requests": total, "elapsed_s": round(elapsed, 2), "rps": round(total / elapsed, 2), "routes": routes}
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(result: dict, baseline: dict | None):
+    print(f"{'route':45} {'count':>7} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8}  statuses")
+    for route, s in result["routes"].items():
+        line = f"{route:45} {s['count']:7} {s['rps']:8} {s['p50_ms']:8} {s['p95_ms']:8} {s['p99_ms']:8}  {s['statuses']}"
+        old = (baseline or {}).get("routes", {}).get(route)
+        if old and old["p95_ms"]:
+            line += f"  p95 {100 * (s['p95_ms'] - old['p95_ms']) / old['p95_ms']:+.0f}%"
+        print(line)
+    print(f"total {result['requests']} requests in {result['elapsed_s']}s = {result['rps']} req/s")
+
+
+async def run(args) -> dict:
+    rec = Recorder()
+    mix = MIXES[args.mix]
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=30,
+                                   limits=httpx.Limits(max_connections=args.concurrency))
+        lifespan = None
+    else:
+        from app.main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://vms", timeout=30)
+        lifespan = app.router.lifespan_context(app)
+
+    async with client:
+        if lifespan is not None:
+            await lifespan.__aenter__()
+        try:
+            runner = Runner(client, rec, args.seed)
+            await runner.setup()
+            started = time.perf_counter()
+            deadline = started + args.duration
+            await asyncio.gather(*(runner.worker(i, mix, deadline) for i in range(args.concurrency)))
+            elapsed = time.perf_counter() - started
+        finally:
+            if lifespan is not None:
+                await lifespan.__aexit__(None, None, None)
+
+    return {
+        "meta": {
+            "target": args.url or "in-process",
+            "mix": args.mix,
+            "weights": mix,
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "seed": args.seed,
+            "revision": git_revision(),
+            "started_at": datetime.now().isoformat(timespec="seconds"),
+        },
+        **summarize(rec, elapsed),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VMS load test")
+    parser.add_argument("--url", help="base URL of a running server; default runs the app in-process")
+    parser.add_argument("--mix", choices=sorted(MIXES), default="default")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=20, help="seconds")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", default="loadtest.json")
+    parser.add_argument("--baseline", help="previous result JSON to compare p95 against")
+    parser.add_argument("--db", help="in-process only: database to copy and run against (default ../vms.db)")
+    args = parser.parse_args()
+
+    tmpdir = None
+    if not args.url:
+        # never write load-test traffic into the real database
+        tmpdir = tempfile.mkdtemp(prefix="vms-load-")
+        src = args.db or os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "vms.db")
+        os.environ["VMS_DB_PATH"] = shutil.copy(src, os.path.join(tmpdir, "vms.db"))
+    try:
+        result = asyncio.run(run(args))
+    finally:
+        if tmpdir:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(result, baseline)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    print(f"✅ Results written to {args.out}")
+    if any(code.startswith("5") or not code.isdigit()
+           for s in result["routes"].values() for code in s["statuses"]):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
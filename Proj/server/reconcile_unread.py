@@ -0,0 +1,37 @@
+import argparse
+import os
+
+# Recount unread notifications per visitor and repair the notification_unread counters.
+# Run from the server directory: python reconcile_unread.py [--db PATH] [--check]
+
+def main():
+    parser = argparse.ArgumentParser(description="recount unread notifications and repair the per-visitor counters")
+    parser.add_argument("--db", help="SQLite database to reconcile (default: VMS_DB_PATH or ../vms.db)")
+    parser.add_argument("--check", action="store_true", help="report drifted counters without writing; exit 1 if any")
+    args = parser.parse_args()
+    if args.db:
+        if os.getenv("VMS_DATABASE_URL"):
+            parser.error("--db is a SQLite path; unset VMS_DATABASE_URL to use it")
+        if not os.path.exists(args.db):
+            parser.error(f"no such database: {args.db}")
+        os.environ["VMS_DB_PATH"] = os.path.abspath(args.db)
+
+    from app.database import SessionLocal
+    from app import rollups
+
+    db = SessionLocal()
+    try:
+        drift = rollups.reconcile_unread(db, fix=not args.check)
+        for visitor_id, stored, actual in drift:
+            print(f"visitor {visitor_id}: {stored} -> {actual}")
+        if args.check:
+            print(f"{len(drift)} unread counter(s) out of date (check only, nothing written)")
+            if drift:
+                raise SystemExit(1)
+            return
+        print(f"✅ Unread counters reconciled: {len(drift)} visitor(s) fixed")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+import argparse
+import os
+import random
+import shutil
+import sys
+import time
+from bisect import bisect
+from datetime import date, timedelta
+
+# Synthetic production-scale data for benchmarks: visitors, locations,
+# reservations and notifications with skewed distributions (a few hot buildings,
+# morning peaks, repeat visitors, quiet weekends), bulk-loaded with executemany
+# in large transactions under the "bulk_load" SQLite profile. Secondary indexes
+# on reservation/notification are dropped for the load and rebuilt afterwards,
+# then the rollups and unread counters are recomputed.
+#
+# Writes to a copy of vms.db (../vms-large.db) unless --db is given; stop the API
+# on that file while seeding. All seeded visitors log in with SEED_PASSWORD.
+# Run from the server directory:
+#   python seed_data.py --visitors 200000 --reservations 10000000 --notifications 5000000
+#   VMS_DB_PATH=../vms-large.db uvicorn app.main:app
+
+SEED_PASSWORD = "Pwd@123456"
+ORGS = ["Google", "Tencent", "Huawei", "Alibaba", "ByteDance", "CUHK-SZ", "HKU", "Independent", None]
+PURPOSES = ["Visiting", "Conference", "Interview", "Campus tour", "Seminar", "Delivery", "Maintenance", "Exam"]
+CAMPUSES = ["LOWER", "MIDDLE", "UPPER"]
+# 09:00-17:00 in quarter hours; lengths in quarters
+QUARTERS = 32
+LENGTHS, LENGTH_WEIGHTS = [2, 4, 6, 8], [3, 5, 2, 1]
+# morning peak: most bookings start 09:00-11:00, a smaller bump after lunch
+START_WEIGHTS = [8 if q < 8 else 3 if q < 16 else 4 if q < 22 else 1 for q in range(QUARTERS)]
+PAST_STATUS = (["approved", "denied", "pending"], [80, 15, 5])
+FUTURE_STATUS = (["pending", "approved", "denied"], [60, 35, 5])
+
+
+def zipf_cum_weights(n: int, s: float) -> list[float]:
+    total, out = 0.0, []
+    for rank in range(1, n + 1):
+        total += 1 / rank ** s
+        out.append(total)
+    return out
+
+
+def stamp(day: str, quarter: int) -> str:
+    # the text format SQLAlchemy's SQLite DateTime type reads and writes
+    minutes = 9 * 60 + 15 * quarter
+    return f"{day} {minutes // 60:02d}:{minutes % 60:02d}:00.000000"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="bulk-load synthetic VMS data")
+    parser.add_argument("--db", help="database to fill (default: copy ../vms.db to ../vms-large.db)")
+    parser.add_argument("--visitors", type=int, default=100_000)
+    parser.add_argument("--locations", type=int, default=0, help="extra locations on top of the existing ones")
+    parser.add_argument("--reservations", type=int, default=1_000_000)
+    parser.add_argument("--notifications", type=int, default=500_000, help="decision notifications (at most one per decided reservation)")
+    parser.add_argument("--days-back", type=int, default=365)
+    parser.add_argument("--days-ahead", type=int, default=60)
+    parser.add_argument("--txn-rows", type=int, default=500_000, help="rows per transaction")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    db_path = args.db or os.path.join(here, "..", "vms-large.db")
+    if not args.db and not os.path.exists(db_path):
+        shutil.copy(os.path.join(here, "..", "vms.db"), db_path)
+    os.environ["VMS_DB_PATH"] = os.path.abspath(db_path)
+    os.environ["VMS_SQLITE_PROFILE"] = "bulk_load"
+
+    from passlib.hash import pbkdf2_sha256
+    from app.database import SessionLocal, engine
+    from app.models import Notification, Reservation
+    from app import rollups
+    from app.settings import PASSWORD_HASH_ROUNDS, DEFAULT_LOCATION_CAPACITY
+
+    rnd = random.Random(args.seed)
+    started = time.perf_counter()
+    with engine.connect() as conn:
+        def insert_rows(sql: str, rows: list[tuple]):
+            conn.exec_driver_sql(sql, rows)
+            conn.commit()
+
+        # --- locations ---------------------------------------------------
+        taken = {tuple(r) for r in conn.exec_driver_sql("SELECT campus, name FROM location").all()}
+        new_locations, k = [], 0
+        while len(new_locations) < args.locations:
+            k += 1
+            key = (CAMPUSES[k % 3], f"Seed Building {k}")
+            if key not in taken:
+                new_locations.append((*key, 1, rnd.choice([20, 50, 50, 100, 200])))
+        if new_locations:
+            insert_rows("INSERT INTO location (campus, name, is_active, capacity) VALUES (?, ?, ?, ?)", new_locations)
+        locations = conn.exec_driver_sql(
+            "SELECT id, name, capacity FROM location WHERE is_active = 1 ORDER BY id").all()
+        if not locations:
+            sys.exit("no active locations to book")
+        rnd.shuffle(locations)  # hotness is independent of id order
+        loc_cw = zipf_cum_weights(len(locations), 1.1)
+        loc_cap = [cap or DEFAULT_LOCATION_CAPACITY for _, _, cap in locations]
+
+        # --- visitors ----------------------------------------------------
+        first_vid = (conn.exec_driver_sql("SELECT MAX(id) FROM visitor").scalar() or 0) + 1
+        password_hash = pbkdf2_sha256.using(rounds=PASSWORD_HASH_ROUNDS).hash(SEED_PASSWORD)
+        joined = date.today() - timedelta(days=args.days_back)
+        for lo in range(first_vid, first_vid + args.visitors, args.txn_rows):
+            hi = min(lo + args.txn_rows, first_vid + args.visitors)
+            insert_rows(
+                "INSERT INTO visitor (id, name, phone, org, email, password_hash, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(vid, f"Visitor{vid}", f"166{vid:08d}", rnd.choice(ORGS), f"visitor{vid}@example.com",
+                  password_hash, f"{joined} 08:00:00.000000") for vid in range(lo, hi)],
+            )
+        visitor_ids = conn.exec_driver_sql("SELECT id FROM visitor").scalars().all()
+        rnd.shuffle(visitor_ids)
+        # repeat visitors: a small share of people make most of the bookings
+        visitor_cw = zipf_cum_weights(len(visitor_ids), 0.9)
+        print(f"visitors: +{args.visitors} ({len(visitor_ids)} total), locations: +{len(new_locations)} ({len(locations)} active)")
+
+        # --- reservations and notifications ------------------------------
+        today = date.today()
+        days = [today + timedelta(days=i) for i in range(-args.days_back, args.days_ahead + 1)]
+        day_str = [d.isoformat() for d in days]
+        day_cw, total = [], 0.0
+        for d in days:
+            total += 0.3 if d.weekday() >= 5 else 1.0
+            day_cw.append(total)
+        past_days = sum(1 for d in days if d < today)
+        decided_share = (past_days * 0.95 + (len(days) - past_days) * 0.40) / len(days)
+        notify_p = min(1.0, args.notifications / max(1, args.reservations * decided_share))
+
+        # per (location, day) quarter-hour occupancy, so no slot exceeds capacity
+        occupancy: dict[tuple[int, int], bytearray] = {}
+        first_rid = (conn.exec_driver_sql("SELECT MAX(id) FROM reservation").scalar() or 0) + 1
+        first_nid = (conn.exec_driver_sql("SELECT MAX(id) FROM notification").scalar() or 0) + 1
+        seeded_indexes = [ix for model in (Reservation, Notification) for ix in model.__table__.indexes]
+        for ix in seeded_indexes:
+            ix.drop(conn, checkfirst=True)
+        conn.commit()
+        n_locs, n_days = len(locations), len(days)
+        times = [stamp("", q) for q in range(QUARTERS + 1)]  # " HH:MM:00.000000"
+        cap = [min(c, 255) for c in loc_cap]
+
+        def fits(li: int, di: int, q: int, length: int) -> bool:
+            occ = occupancy.get((li, di))
+            if occ is None:
+                occ = occupancy[(li, di)] = bytearray(QUARTERS)
+            if max(occ[q:q + length]) >= cap[li]:
+                return False
+            for i in range(q, q + length):
+                occ[i] += 1
+            return True
+
+        rid, nid, skipped, notified = first_rid, first_nid, 0, 0
+        try:
+            remaining = args.reservations
+            while remaining > 0:
+                n = min(remaining, args.txn_rows)
+                remaining -= n
+                picks = zip(
+                    rnd.choices(range(n_locs), cum_weights=loc_cw, k=n),
+                    rnd.choices(range(n_days), cum_weights=day_cw, k=n),
+                    rnd.choices(range(QUARTERS), weights=START_WEIGHTS, k=n),
+                    rnd.choices(LENGTHS, weights=LENGTH_WEIGHTS, k=n),
+                    rnd.choices(visitor_ids, cum_weights=visitor_cw, k=n),
+                    rnd.choices(PURPOSES, k=n),
+                    rnd.choices(range(1, 15), k=n),
+                )
+                reservations, notifications = [], []
+                for li, di, q, length, vid, purpose, lead in picks:
+                    q = min(q, QUARTERS - length)
+                    # a full slot sends the visitor elsewhere: redraw place, day and time
+                    for _ in range(20):
+                        if fits(li, di, q, length):
+                            break
+                        li = bisect(loc_cw, rnd.random() * loc_cw[-1])
+                        di = bisect(day_cw, rnd.random() * day_cw[-1])
+                        q = rnd.randrange(QUARTERS - length + 1)
+                    else:
+                        skipped += 1
+                        continue
+                    r = rnd.random()
+                    if di < past_days:
+                        status = "approved" if r < 0.80 else "denied" if r < 0.95 else "pending"
+                    else:
+                        status = "pending" if r < 0.60 else "approved" if r < 0.95 else "denied"
+                    day = day_str[di]
+                    start = day + times[q]
+                    created = day_str[max(0, di - lead)] + times[0]
+                    loc_id, loc_name, _ = locations[li]
+                    driving = rnd.random() < 0.3
+                    reservations.append((
+                        rid, vid, start, day + times[q + length], loc_name, loc_id, purpose, status, int(driving),
+                        f"{chr(65 + rid % 26)}{rid % 100000:05d}" if driving else None, created, created,
+                    ))
+                    if status != "pending" and rnd.random() < notify_p:
+                        notifications.append((
+                            nid, vid, "reservation_status", rid, "Reservation Approval Result",
+                            f"Your reservation on {start[:16]} at {loc_name} has been {status.upper()}.",
+                            1 if di < past_days - 7 or rnd.random() < 0.5 else 0, created,
+                        ))
+                        nid += 1
+                    rid += 1
+                insert_rows(
+                    "INSERT INTO reservation (id, visitor_id, start_time, end_time, location, location_id, purpose,"
+                    " status, is_driving, plate_number, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    reservations,
+                )
+                if notifications:
+                    insert_rows(
+                        "INSERT INTO notification (id, visitor_id, type, reservation_id, title, body, is_read, created_at)"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        notifications,
+                    )
+                notified += len(notifications)
+                print(f"  reservations {rid - first_rid:>11,}  notifications {notified:>11,}  {time.perf_counter() - started:7.1f}s")
+        finally:
+            t0 = time.perf_counter()
+            for ix in seeded_indexes:
+                ix.create(conn, checkfirst=True)
+            conn.commit()
+            print(f"indexes rebuilt in {time.perf_counter() - t0:.1f}s")
+        if skipped:
+            print(f"{skipped} reservations skipped: no free slot after 20 redraws (add --locations or --days-back)")
+
+    db = SessionLocal()
+    try:
+        rollups.backfill(db)
+        rollups.reconcile_unread(db)
+    finally:
+        db.close()
+    with engine.connect() as conn:
+        conn.exec_driver_sql("ANALYZE")
+        conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+    engine.dispose()
+    print(f"✅ Seeded {rid - first_rid} reservations and {notified} notifications into {db_path} "
+          f"in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -92,6 +92,23 @@ WHERE (:location_id IS NULL OR r.location_id = :location_id)
   AND (:date IS NULL OR DATE(r.start_time) = :date)
 ORDER BY r.start_time DESC;
 
+SELECT r.id,
+       v.name  AS visitor_name,
+       v.org   AS visitor_org,
+       r.start_time, r.end_time,
+       l.campus,
+       l.name  AS location,
+       r.purpose, r.status,
+       r.is_driving, r.plate_number
+FROM reservation r
+JOIN visitor  v ON v.id = r.visitor_id
+JOIN location l ON l.id = r.location_id
+WHERE (:location_id IS NULL OR r.location_id = :location_id)
+  AND (r.start_time < :after_start
+       OR (r.start_time = :after_start AND r.id < :after_id))
+ORDER BY r.start_time DESC, r.id DESC
+LIMIT :limit;
+
 SELECT r.*
 FROM reservation r
 WHERE r.visitor_id = :visitor_id
@@ -104,9 +121,36 @@ SET status = :decision,
 WHERE id = :reservation_id
   AND status = 'pending';
 
-INSERT INTO notification (visitor_id, type, reservation_id, title, body, is_read)
+-- same transaction as the decision: queue the notification in the outbox
+INSERT INTO notification_outbox (visitor_id, payload, attempts, available_at, created_at)
+VALUES (:visitor_id, :notification_json, 0, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP);
+
+-- bulk decision: one conditional UPDATE, then one multi-row outbox INSERT
+UPDATE reservation
+SET status = :decision,
+    updated_at = CURRENT_TIMESTAMP
+WHERE id IN (:ids)
+  AND status = 'pending'
+RETURNING id, visitor_id, location_id, location, start_time, end_time;
+
+-- outbox dispatcher: due rows, then claim + deliver in one transaction
+SELECT id
+FROM notification_outbox
+WHERE dispatched_at IS NULL
+  AND available_at <= CURRENT_TIMESTAMP
+  AND attempts < :max_attempts
+ORDER BY dispatched_at, id
+LIMIT :batch_size;
+
+UPDATE notification_outbox
+SET dispatched_at = CURRENT_TIMESTAMP
+WHERE id IN (:ids)
+  AND dispatched_at IS NULL
+RETURNING payload, created_at;
+
+INSERT INTO notification (visitor_id, type, reservation_id, title, body, is_read, created_at)
 VALUES (:visitor_id, 'reservation_status', :reservation_id,
-        'Reservation Approval Result', :body_text, 0);
+        'Reservation Approval Result', :body_text, 0, :queued_at);
 
 
 WITH day AS (
@@ -163,17 +207,51 @@ uv_days AS (
 SELECT COUNT(*) AS total_unique_visitor_days_up_to_date
 FROM uv_days;
 
+SELECT location_id, status, count
+FROM reservation_rollup
+WHERE day = :d
+  AND count > 0;
+
+SELECT COALESCE(SUM(visitors), 0) AS total_unique_visitor_days_up_to_date
+FROM visitor_day_total
+WHERE day <= :d;
+
+INSERT INTO reservation_rollup (day, location_id, status, count)
+VALUES (:d, :location_id, :status, :delta)
+ON CONFLICT (day, location_id, status) DO UPDATE SET count = count + :delta;
+
+-- inbox page; :before_created_at/:before_id come from the previous page's X-Next-Cursor
 SELECT *
 FROM notification
 WHERE visitor_id = :me
   AND (:unread_only = 0 OR is_read = 0)
-ORDER BY created_at DESC
-LIMIT :limit OFFSET :offset;
+  AND (created_at, id) < (:before_created_at, :before_id)
+ORDER BY created_at DESC, id DESC
+LIMIT :limit;
+
+-- retention (archive_notifications.py), one batch per transaction
+INSERT INTO notification_archive (id, visitor_id, type, reservation_id, title, body, is_read, created_at, archived_at)
+SELECT id, visitor_id, type, reservation_id, title, body, is_read, created_at, CURRENT_TIMESTAMP
+FROM notification
+WHERE id IN (:batch_ids) AND is_read = 1;
+
+DELETE FROM notification
+WHERE id IN (:batch_ids) AND is_read = 1;
 
-SELECT COUNT(*) AS unread
+SELECT unread
+FROM notification_unread
+WHERE visitor_id = :me;
+
+INSERT INTO notification_unread (visitor_id, unread)
+VALUES (:visitor_id, :delta)
+ON CONFLICT (visitor_id) DO UPDATE SET unread = unread + :delta;
+
+SELECT *
 FROM notification
 WHERE visitor_id = :me
-  AND is_read = 0;
+  AND id > :last_event_id
+ORDER BY id
+LIMIT 200;
 
 UPDATE notification
 SET is_read = :is_read     
@@ -186,12 +264,20 @@ WHERE visitor_id = :me
   AND is_read = 0;
 
 
+SELECT start_time, end_time
+FROM reservation
+WHERE location_id = :location_id
+  AND start_time >= DATE(:s)
+  AND start_time <  DATE(:s, '+1 day')
+  AND status IN ('pending','approved');
+
 SELECT COUNT(*) AS overlap_count
 FROM reservation
 WHERE location_id = :location_id
-  AND DATE(start_time) = DATE(:s)
-  AND status IN ('pending','approved')   
-  AND NOT (end_time <= :s OR start_time >= :e);
+  AND start_time >= DATE(:s)
+  AND start_time <  :e
+  AND end_time   >  :s
+  AND status IN ('pending','approved');
 
 SELECT COUNT(*) AS my_count_today
 FROM reservation
@@ -27,12 +27,14 @@ CREATE TABLE IF NOT EXISTS visitor (
   created_at    DATETIME DEFAULT CURRENT_TIMESTAMP
 );
 CREATE INDEX IF NOT EXISTS ix_visitor_phone ON visitor(phone);
+CREATE INDEX IF NOT EXISTS ix_visitor_email ON visitor(email);
 
 CREATE TABLE IF NOT EXISTS location (
   id        INTEGER PRIMARY KEY,
   campus    TEXT    NOT NULL,  
   name      TEXT    NOT NULL,
-  is_active INTEGER DEFAULT 1
+  is_active INTEGER DEFAULT 1,
+  capacity  INTEGER            -- NULL = server default
 );
 CREATE INDEX IF NOT EXISTS ix_location_campus ON location(campus);
 CREATE INDEX IF NOT EXISTS ix_location_name   ON location(name);
@@ -62,8 +64,8 @@ CREATE INDEX IF NOT EXISTS ix_reservation_location_id ON reservation(location_id
 CREATE INDEX IF NOT EXISTS ix_reservation_status     ON reservation(status);
 CREATE INDEX IF NOT EXISTS ix_reservation_plate      ON reservation(plate_number);
 
-CREATE INDEX IF NOT EXISTS ix_resv_loc_time
-  ON reservation(location, start_time, end_time);
+CREATE INDEX IF NOT EXISTS ix_resv_locid_time
+  ON reservation(location_id, start_time, end_time);
 
 CREATE INDEX IF NOT EXISTS ix_resv_status_date
   ON reservation(status, start_time);
@@ -78,6 +80,59 @@ CREATE TABLE IF NOT EXISTS notification (
   is_read        INTEGER NOT NULL DEFAULT 0,
   created_at     DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
 );
-CREATE INDEX IF NOT EXISTS ix_notification_visitor_id ON notification(visitor_id);
-CREATE INDEX IF NOT EXISTS ix_notification_is_read    ON notification(is_read);
-CREATE INDEX IF NOT EXISTS ix_notification_created_at ON notification(created_at);
+-- inbox pages (newest first) and the unread-only view / read_all
+CREATE INDEX IF NOT EXISTS ix_notif_visitor_created      ON notification(visitor_id, created_at);
+CREATE INDEX IF NOT EXISTS ix_notif_visitor_read_created ON notification(visitor_id, is_read, created_at);
+
+-- read notifications past retention, moved by archive_notifications.py
+CREATE TABLE IF NOT EXISTS notification_archive (
+  id             INTEGER PRIMARY KEY,   -- original notification id
+  visitor_id     INTEGER NOT NULL REFERENCES visitor(id) ON DELETE CASCADE,
+  type           TEXT    NOT NULL,
+  reservation_id INTEGER,
+  title          TEXT    NOT NULL,
+  body           TEXT,
+  is_read        INTEGER NOT NULL,
+  created_at     DATETIME NOT NULL,
+  archived_at    DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS ix_notif_archive_visitor_created ON notification_archive(visitor_id, created_at);
+
+CREATE TABLE IF NOT EXISTS reservation_rollup (
+  day         DATE    NOT NULL,
+  location_id INTEGER NOT NULL,   -- 0 = no location
+  status      TEXT    NOT NULL,
+  count       INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (day, location_id, status)
+);
+
+CREATE TABLE IF NOT EXISTS visitor_day (
+  day            DATE    NOT NULL,
+  visitor_id     INTEGER NOT NULL,
+  approved_count INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (day, visitor_id)
+);
+
+CREATE TABLE IF NOT EXISTS visitor_day_total (
+  day      DATE    PRIMARY KEY,
+  visitors INTEGER NOT NULL DEFAULT 0
+);
+
+-- unread notifications per visitor, maintained with every notification write
+CREATE TABLE IF NOT EXISTS notification_unread (
+  visitor_id INTEGER PRIMARY KEY REFERENCES visitor(id) ON DELETE CASCADE,
+  unread     INTEGER NOT NULL DEFAULT 0
+);
+
+-- notifications queued with the status change, delivered by the outbox dispatcher
+CREATE TABLE IF NOT EXISTS notification_outbox (
+  id            INTEGER PRIMARY KEY AUTOINCREMENT,
+  visitor_id    INTEGER NOT NULL REFERENCES visitor(id) ON DELETE CASCADE,
+  payload       TEXT    NOT NULL,
+  attempts      INTEGER NOT NULL DEFAULT 0,
+  available_at  DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  dispatched_at DATETIME,
+  last_error    TEXT,
+  created_at    DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS ix_outbox_undispatched ON notification_outbox(dispatched_at, id);